@@ -1,9 +1,14 @@
 import streamlit as st
 import os
+import threading
 from dotenv import load_dotenv
 from resume_parser.parser import ResumeParser
+from resume_parser.cache import ParseCache
 from job_search.job_search import JobSearch
+from job_search.ingest import default_sources, run_ingestion
 from rag_system.rag import RAGSystem
+from rag_system.cache import EmbeddingCache
+from database.models import APPLICATION_STATUSES
 from database.operations import Database
 from automation.job_applicator import JobApplicator
 import logging
@@ -16,10 +21,44 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize components
-resume_parser = ResumeParser(os.getenv('GEMINI_API_KEY'))
-job_search = JobSearch()
-rag_system = RAGSystem(os.getenv('GEMINI_API_KEY'))
+resume_parser = ResumeParser(
+    os.getenv('GEMINI_API_KEY'),
+    cache=ParseCache(os.path.join("data", "cache", "resume_parses.sqlite"))
+)
 database = Database(os.getenv('DATABASE_URL'))
+
+@st.cache_resource
+def load_job_search() -> JobSearch:
+    """Build the job catalogue once per process, pulling platform feeds when configured.
+
+    Streamlit re-runs this script on every interaction; ingesting again would
+    re-fetch every feed and reorder postings under saved search cursors.
+    Search results are indexed into the RAG system as they are loaded.
+    """
+    job_search = JobSearch()
+    if os.getenv('JOB_FEEDS_DIR'):
+        run_ingestion(default_sources(os.getenv('JOB_FEEDS_DIR')), [job_search.add_jobs])
+    return job_search
+
+job_search = load_job_search()
+
+@st.cache_resource
+def load_rag_system() -> RAGSystem:
+    """Build the RAG system once per process so its index, BM25 postings and
+    cover letter cache survive Streamlit reruns and are shared by sessions."""
+    return RAGSystem(
+        os.getenv('GEMINI_API_KEY'),
+        index_path=os.getenv('RAG_INDEX_PATH', os.path.join("data", "index", "jobs")),
+        embedding_cache=EmbeddingCache(disk_path=os.path.join("data", "cache", "embeddings.sqlite"))
+    )
+
+@st.cache_resource
+def load_rag_index_lock() -> threading.Lock:
+    """Process-wide lock for index updates; sessions run in their own threads."""
+    return threading.Lock()
+
+rag_system = load_rag_system()
+rag_index_lock = load_rag_index_lock()
 job_applicator = JobApplicator()
 
 def main():
@@ -106,6 +145,27 @@ def show_upload_resume_page():
         except Exception as e:
             st.error(f"Error parsing resume: {str(e)}")
 
+def load_search_page(page_size: int = 50):
+    """Fetch the next page of the current search and index its postings."""
+    try:
+        page = job_search.search_page(
+            page_size=page_size,
+            cursor=st.session_state.get('search_cursor'),
+            **st.session_state['search_params']
+        )
+        logger.info(f"Loaded {len(page.jobs)} jobs from search")
+        st.session_state['search_results'].extend(page.jobs)
+        st.session_state['search_cursor'] = page.next_cursor
+        
+        # Index any new or changed postings
+        if page.jobs:
+            with rag_index_lock:
+                rag_system.upsert_jobs(page.jobs)
+                rag_system.save_index()
+            logger.info("Updated RAG index")
+    except Exception as e:
+        st.error(f"Error searching jobs: {str(e)}")
+
 def show_search_jobs_page():
     st.header("Search Jobs")
     
@@ -120,71 +180,101 @@ def show_search_jobs_page():
     # Search form
     query = st.text_input("Job Title or Keywords")
     location = st.text_input("Location")
+    platforms = st.multiselect("Platforms", ["LinkedIn", "Indeed", "Internshala"])
+    remote_only = st.checkbox("Remote only")
     
     if st.button("Search"):
+        st.session_state['search_params'] = {
+            'query': query,
+            'location': location,
+            'platform': platforms or None,
+            'remote': True if remote_only else None
+        }
+        st.session_state['search_results'] = []
+        st.session_state['search_cursor'] = None
+        load_search_page()
+    
+    if 'search_params' not in st.session_state:
+        return
+    
+    if st.session_state.get('search_cursor') and st.button("Load more results"):
+        load_search_page()
+    
+    jobs = st.session_state['search_results']
+    if not jobs:
+        st.warning("No jobs found matching your criteria")
+        return
+    
+    try:
+        # Find similar jobs among the results loaded so far
+        similar_jobs = rag_system.find_similar_jobs(
+            st.session_state['resume_data'],
+            candidate_ids=[job['id'] for job in jobs]
+        )
+        logger.info(f"Found {len(similar_jobs)} similar jobs")
+        
+        # Draft letters for every match at once; they are cached for the Apply buttons
+        drafts = st.session_state.setdefault('cover_letter_drafts', {})
+        if st.button("Draft cover letters for all matches"):
+            progress = st.progress(0.0)
+            for done, (job, letter) in enumerate(
+                rag_system.generate_cover_letters_batch(similar_jobs, st.session_state['resume_data']), start=1
+            ):
+                drafts[job['id']] = letter
+                progress.progress(done / len(similar_jobs))
+        
+        # Check every result against past applications in one query
         try:
-            # Search jobs
-            jobs = job_search.search_jobs(query, location)
-            logger.info(f"Found {len(jobs)} jobs from search")
-            
-            if not jobs:
-                st.warning("No jobs found matching your criteria")
-                return
-            
-            # Build RAG index
-            rag_system.build_index(jobs)
-            logger.info("Built RAG index")
-            
-            # Find similar jobs
-            similar_jobs = rag_system.find_similar_jobs(st.session_state['resume_data'])
-            logger.info(f"Found {len(similar_jobs)} similar jobs")
-            
-            # Display results
-            st.subheader("Matching Jobs")
-            for job in similar_jobs:
-                with st.expander(f"{job['title']} at {job['company']}"):
-                    st.write(f"**Location:** {job['location']}")
-                    st.write(f"**Salary:** {job['salary_range']}")
-                    st.write("**Description:**")
-                    st.write(job['description'])
-                    st.write("**Requirements:**")
-                    for req in job['requirements']:
-                        st.write(f"- {req}")
-                    
-                    # Check if already applied
-                    try:
-                        existing_apps = database.get_user_applications(st.session_state['user'].id)
-                        already_applied = any(app.job_id == job['id'] for app in existing_apps)
-                    except Exception as e:
-                        logger.error(f"Error checking existing applications: {str(e)}")
-                        already_applied = False
-                    
-                    if already_applied:
-                        st.info("You have already applied to this job")
-                    else:
-                        if st.button(f"Apply to {job['title']}", key=f"apply_{job['id']}"):
-                            try:
-                                # Generate cover letter
-                                cover_letter = rag_system.generate_cover_letter(
-                                    job,
-                                    st.session_state['resume_data']
-                                )
-                                
-                                # Save application
-                                application = database.add_job_application(
-                                    st.session_state['user'].id,
-                                    job,
-                                    cover_letter,
-                                    st.session_state.get('resume_path', '')
-                                )
-                                
-                                st.success(f"Successfully applied to {job['title']} at {job['company']}!")
-                                st.experimental_rerun()
-                                
-                            except Exception as e:
-                                st.error(f"Error applying to job: {str(e)}")
+            applied_ids = database.get_applied_job_ids(
+                st.session_state['user'].id,
+                [job['id'] for job in similar_jobs]
+            )
         except Exception as e:
-            st.error(f"Error searching jobs: {str(e)}")
+            logger.error(f"Error checking existing applications: {str(e)}")
+            applied_ids = set()
+        
+        # Display results
+        st.subheader("Matching Jobs")
+        for job in similar_jobs:
+            with st.expander(f"{job['title']} at {job['company']}"):
+                st.write(f"**Location:** {job['location']}")
+                st.write(f"**Salary:** {job['salary_range']}")
+                st.write("**Description:**")
+                st.write(job['description'])
+                st.write("**Requirements:**")
+                for req in job['requirements']:
+                    st.write(f"- {req}")
+                if job['id'] in drafts:
+                    st.write("**Draft Cover Letter:**")
+                    st.write(drafts[job['id']])
+                
+                if job['id'] in applied_ids:
+                    st.info("You have already applied to this job")
+                else:
+                    if st.button(f"Apply to {job['title']}", key=f"apply_{job['id']}"):
+                        try:
+                            # Generate cover letter
+                            cover_letter = rag_system.generate_cover_letter(
+                                job,
+                                st.session_state['resume_data']
+                            )
+                            
+                            # Save application
+                            application = database.add_job_application(
+                                st.session_state['user'].id,
+                                job,
+                                cover_letter,
+                                st.session_state.get('resume_path', '')
+                            )
+                            
+                            st.success(f"Successfully applied to {job['title']} at {job['company']}!")
+                            st.session_state.pop('applications', None)
+                            st.experimental_rerun()
+                            
+                        except Exception as e:
+                            st.error(f"Error applying to job: {str(e)}")
+    except Exception as e:
+        st.error(f"Error matching jobs: {str(e)}")
 
 def show_cover_letter_page():
     st.header("Generate Cover Letter")
@@ -203,6 +293,7 @@ def show_cover_letter_page():
     company = st.text_input("Company Name")
     job_description = st.text_area("Job Description")
     requirements = st.text_area("Job Requirements (one per line)")
+    regenerate = st.checkbox("Regenerate instead of reusing a previous letter")
     
     if st.button("Generate Cover Letter"):
         try:
@@ -214,15 +305,13 @@ def show_cover_letter_page():
                 "requirements": [req.strip() for req in requirements.split('\n') if req.strip()]
             }
             
-            # Generate cover letter
-            cover_letter = rag_system.generate_cover_letter(
-                job_data,
-                st.session_state['resume_data']
-            )
-            
-            # Display cover letter
+            # Generate cover letter, rendering it as the model writes it
             st.subheader("Generated Cover Letter")
-            st.write(cover_letter)
+            cover_letter = st.write_stream(rag_system.generate_cover_letter_stream(
+                job_data,
+                st.session_state['resume_data'],
+                regenerate=regenerate
+            ))
             
             # Save to database
             if st.button("Save Cover Letter"):
@@ -232,10 +321,31 @@ def show_cover_letter_page():
                     cover_letter,
                     st.session_state.get('resume_path', '')
                 )
+                st.session_state.pop('applications', None)
                 st.success("Cover letter saved!")
         except Exception as e:
             st.error(f"Error generating cover letter: {str(e)}")
 
+def load_applications_page(page_size: int = 20):
+    """Fetch the next page of the user's applications for the current status filter."""
+    try:
+        page = database.list_applications(
+            st.session_state['user'].id,
+            page_size=page_size,
+            cursor=st.session_state.get('applications_cursor'),
+            status=st.session_state['applications_filter']
+        )
+        st.session_state['applications'].extend(page.applications)
+        st.session_state['applications_cursor'] = page.next_cursor
+    except Exception as e:
+        st.error(f"Error loading applications: {str(e)}")
+
+def reset_applications():
+    """Forget loaded applications so the listing restarts from the newest."""
+    st.session_state['applications'] = []
+    st.session_state['applications_cursor'] = None
+    load_applications_page()
+
 def show_applications_page():
     st.header("My Applications")
     
@@ -244,25 +354,35 @@ def show_applications_page():
         return
     
     try:
-        # Get user's applications
-        applications = database.get_user_applications(st.session_state['user'].id)
+        # Reload from the first page for a new user, filter or application
+        status_filter = st.multiselect("Status", APPLICATION_STATUSES)
+        listing = (st.session_state['user'].id, status_filter)
+        if 'applications' not in st.session_state or st.session_state.get('applications_listing') != listing:
+            st.session_state['applications_listing'] = listing
+            st.session_state['applications_filter'] = status_filter
+            reset_applications()
         
+        applications = st.session_state['applications']
         if not applications:
             st.info("No applications yet")
             return
         
-        # Display applications
+        # Display applications; cover letters are fetched only when shown
+        cover_letters = st.session_state.setdefault('cover_letters', {})
         for app in applications:
             with st.expander(f"{app.job_title} at {app.company}"):
                 st.write(f"**Status:** {app.status}")
                 st.write(f"**Applied Date:** {app.applied_date}")
-                st.write("**Cover Letter:**")
-                st.write(app.cover_letter)
+                if st.toggle("Show cover letter", key=f"letter_{app.id}"):
+                    if app.id not in cover_letters:
+                        cover_letters[app.id] = database.get_cover_letter(app.id)
+                    st.write("**Cover Letter:**")
+                    st.write(cover_letters[app.id])
                 
                 # Update status
                 new_status = st.selectbox(
                     "Update Status",
-                    ["applied", "interviewed", "rejected", "accepted"],
+                    APPLICATION_STATUSES,
                     key=f"status_{app.id}"
                 )
                 
@@ -270,9 +390,14 @@ def show_applications_page():
                     try:
                         database.update_application_status(app.id, new_status)
                         st.success("Status updated!")
+                        reset_applications()
                         st.experimental_rerun()
                     except Exception as e:
                         st.error(f"Error updating status: {str(e)}")
+        
+        if st.session_state.get('applications_cursor') and st.button("Load more applications"):
+            load_applications_page()
+            st.experimental_rerun()
     except Exception as e:
         st.error(f"Error loading applications: {str(e)}")
 
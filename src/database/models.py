@@ -1,10 +1,12 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
 
+APPLICATION_STATUSES = ('applied', 'interviewed', 'rejected', 'accepted')
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -18,6 +20,12 @@ class User(Base):
 
 class JobApplication(Base):
     __tablename__ = 'job_applications'
+    __table_args__ = (
+        # One application per user and posting; also serves the "already applied" lookup
+        Index('ix_job_applications_user_job_platform', 'user_id', 'job_id', 'platform', unique=True),
+        # Newest-first listing; SQLite appends the id (rowid) to every index entry
+        Index('ix_job_applications_user_applied', 'user_id', 'applied_date'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
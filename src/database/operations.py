@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, or_
 from sqlalchemy.orm import sessionmaker
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, NamedTuple, Optional, Sequence, Set, Union
 from datetime import datetime
+import base64
+import hashlib
+import json
 import logging
 from .models import Base, User, JobApplication, JobSearch
 import bcrypt
@@ -11,6 +14,31 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Job ids per IN (...) clause, well under SQLite's bound parameter limit
+MAX_IN_PARAMS = 500
+
+
+class ApplicationSummary(NamedTuple):
+    """Application without its cover letter and notes, for listings."""
+    id: int
+    job_id: int
+    job_title: str
+    company: str
+    platform: str
+    status: str
+    applied_date: datetime
+    resume_path: Optional[str]
+
+
+class ApplicationPage(NamedTuple):
+    """One page of applications and the cursor for the page after it (None at the end)."""
+    applications: List[ApplicationSummary]
+    next_cursor: Optional[str]
+
+
+# Columns read for listings; the TEXT columns are loaded per application on demand
+SUMMARY_COLUMNS = tuple(getattr(JobApplication, field) for field in ApplicationSummary._fields)
+
 class Database:
     def __init__(self, db_url: str):
         """Initialize database connection."""
@@ -25,6 +53,7 @@ class Database:
             # Create tables if they don't exist
             Base.metadata.create_all(self.engine)
             logger.info("Database tables created successfully")
+            self._create_indexes()
             
             self.Session = sessionmaker(bind=self.engine)
             
@@ -35,6 +64,16 @@ class Database:
             logger.error(f"Error initializing database: {str(e)}")
             raise
 
+    def _create_indexes(self):
+        """Add indexes declared since the tables were created; create_all skips existing tables."""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(self.engine, checkfirst=True)
+                except Exception as e:
+                    # e.g. duplicate applications recorded before the unique index existed
+                    logger.warning(f"Could not create index {index.name}: {str(e)}")
+
     def _create_test_user(self):
         """Create a test user if no users exist."""
         try:
@@ -162,6 +201,114 @@ class Database:
             if session:
                 session.close()
 
+    def get_applied_job_ids(self, user_id: int, job_ids: Iterable[int]) -> Set[int]:
+        """Return which of job_ids the user has applied to, reading only the indexed id columns."""
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return set()
+        session = None
+        try:
+            session = self.Session()
+            applied = set()
+            for start in range(0, len(job_ids), MAX_IN_PARAMS):
+                rows = session.query(JobApplication.job_id)\
+                    .filter(JobApplication.user_id == user_id,
+                            JobApplication.job_id.in_(job_ids[start:start + MAX_IN_PARAMS]))\
+                    .all()
+                applied.update(row.job_id for row in rows)
+            return applied
+        except Exception as e:
+            logger.error(f"Error getting applied job ids: {str(e)}")
+            raise
+        finally:
+            if session:
+                session.close()
+
+    @staticmethod
+    def _listing_key(user_id: int, statuses: Optional[List[str]]) -> str:
+        """Fingerprint of a listing so a cursor cannot be replayed against a different one."""
+        params = json.dumps([user_id, statuses])
+        return hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _encode_cursor(applied_date: datetime, application_id: int, listing_key: str) -> str:
+        payload = json.dumps({'applied_date': applied_date.isoformat(), 'id': application_id,
+                              'listing': listing_key}).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, listing_key: str):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            applied_date, application_id = datetime.fromisoformat(payload['applied_date']), int(payload['id'])
+            cursor_key = payload['listing']
+        except Exception:
+            raise ValueError("Invalid applications cursor")
+        if cursor_key != listing_key:
+            raise ValueError("Applications cursor belongs to a different listing")
+        return applied_date, application_id
+
+    def list_applications(self, user_id: int, page_size: int = 20, cursor: Optional[str] = None,
+                          status: Optional[Union[str, Sequence[str]]] = None) -> ApplicationPage:
+        """Fetch one page of a user's applications, newest first, starting after cursor.
+
+        Pages are keyed on (applied_date, id), so each one is an index range
+        scan however deep the listing goes, and applications added meanwhile
+        do not shift later pages. status limits the listing to one or more
+        statuses. Cover letters and notes are left out; use get_cover_letter.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        statuses = [status] if isinstance(status, str) else sorted(status) if status else None
+        listing_key = self._listing_key(user_id, statuses)
+        after = self._decode_cursor(cursor, listing_key) if cursor else None
+        session = None
+        try:
+            session = self.Session()
+            query = session.query(*SUMMARY_COLUMNS).filter(JobApplication.user_id == user_id)
+            if statuses:
+                query = query.filter(JobApplication.status.in_(statuses))
+            if after is not None:
+                applied_date, application_id = after
+                query = query.filter(or_(
+                    JobApplication.applied_date < applied_date,
+                    and_(JobApplication.applied_date == applied_date, JobApplication.id < application_id),
+                ))
+            # One extra row tells whether another page follows
+            rows = query.order_by(JobApplication.applied_date.desc(), JobApplication.id.desc())\
+                .limit(page_size + 1)\
+                .all()
+            applications = [ApplicationSummary(*row) for row in rows[:page_size]]
+            next_cursor = None
+            if len(rows) > page_size:
+                last = applications[-1]
+                next_cursor = self._encode_cursor(last.applied_date, last.id, listing_key)
+            return ApplicationPage(applications, next_cursor)
+        except Exception as e:
+            logger.error(f"Error listing applications: {str(e)}")
+            raise
+        finally:
+            if session:
+                session.close()
+
+    def get_cover_letter(self, application_id: int) -> Optional[str]:
+        """Load the cover letter of one application."""
+        session = None
+        try:
+            session = self.Session()
+            row = session.query(JobApplication.cover_letter)\
+                .filter(JobApplication.id == application_id)\
+                .first()
+            if row is None:
+                raise ValueError(f"Application with ID {application_id} not found")
+            return row.cover_letter
+        except Exception as e:
+            logger.error(f"Error getting cover letter: {str(e)}")
+            raise
+        finally:
+            if session:
+                session.close()
+
     def save_job_search(self, user_id: int, query: str, location: str, results_count: int) -> JobSearch:
         """Save job search history."""
         try:
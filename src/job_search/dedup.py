@@ -0,0 +1,109 @@
+import numpy as np
+from typing import Dict, Iterable, List, Set, Tuple
+import logging
+
+from utils.text import stable_hash, tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEDUP_FIELDS = ('title', 'company', 'description')
+
+
+def same_company(first: Dict, second: Dict) -> bool:
+    """Whether two postings name the same employer, allowing suffixes like "Pvt Ltd"."""
+    first_tokens = set(tokenize(str(first.get('company') or '')))
+    second_tokens = set(tokenize(str(second.get('company') or '')))
+    if not first_tokens or not second_tokens:
+        return first_tokens == second_tokens
+    return first_tokens <= second_tokens or second_tokens <= first_tokens
+
+
+def job_shingles(job: Dict, size: int = 2) -> Set[str]:
+    """Word n-grams over a job's title, company and description."""
+    tokens = []
+    for field in DEDUP_FIELDS:
+        tokens.extend(tokenize(str(job.get(field) or '')))
+    if len(tokens) < size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[start:start + size]) for start in range(len(tokens) - size + 1)}
+
+
+class MinHashLSH:
+    """MinHash signatures with LSH banding for near-duplicate job lookup.
+
+    Each signature is split into bands; postings sharing any band land in a
+    common bucket, so a lookup only compares against bucket-mates rather than
+    every stored posting. Candidates are confirmed by the estimated Jaccard
+    similarity of their full signatures.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.5,
+                 shingle_size: int = 2, seed: int = 0):
+        """Initialize empty index; num_perm must be divisible by bands."""
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        # Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32, with odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.signatures: Dict[int, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, key) -> bool:
+        return key in self.signatures
+
+    def signature(self, job: Dict) -> np.ndarray:
+        """MinHash signature of a job's shingles."""
+        shingles = job_shingles(job, self.shingle_size)
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = np.fromiter((stable_hash(shingle) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        with np.errstate(over='ignore'):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: int, signature: np.ndarray):
+        """Store a signature, replacing any previous one for key."""
+        self.remove([key])
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def remove(self, keys: Iterable[int]):
+        """Drop signatures, ignoring unknown keys."""
+        for key in keys:
+            signature = self.signatures.pop(key, None)
+            if signature is None:
+                continue
+            for band_key in self._band_keys(signature):
+                bucket = self._buckets[band_key]
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, signature: np.ndarray) -> List[Tuple[int, float]]:
+        """Stored keys whose estimated Jaccard similarity reaches the threshold, most similar first."""
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
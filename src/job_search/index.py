@@ -0,0 +1,132 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+from utils.text import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GRAM_SIZE = 3
+
+
+class TextIndex:
+    """Inverted index over lowercased text fields that preserves substring matching.
+
+    The vocabulary holds every whitespace-separated chunk of the lowercased
+    text plus its word tokens, each mapped to the rows containing it. A term
+    without whitespace is a substring of a field exactly when it is a
+    substring of one of its chunks, so single-term lookups go through a
+    trigram index over the vocabulary, or for one- and two-character terms
+    a map of every such substring, instead of scanning every job.
+    """
+
+    def __init__(self):
+        """Initialize empty index."""
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._postings: List[List[int]] = []
+        self._grams: Dict[str, Set[int]] = {}
+        # Every one- and two-character substring -> terms containing it, for terms too short for trigrams
+        self._short_grams: Dict[str, Set[int]] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        # Rows whose lowercased text is kept for verifying multi-term phrases
+        self.texts: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+            self._postings.append([])
+            for start in range(max(1, len(term) - GRAM_SIZE + 1)):
+                self._grams.setdefault(term[start:start + GRAM_SIZE], set()).add(term_id)
+            for size in range(1, GRAM_SIZE):
+                for start in range(len(term) - size + 1):
+                    self._short_grams.setdefault(term[start:start + size], set()).add(term_id)
+            self._sorted_terms = None
+        return term_id
+
+    def add(self, row: int, fields: Iterable[str]):
+        """Index one row; rows must be added in increasing order."""
+        lowered = [str(field or '').lower() for field in fields]
+        self.texts[row] = lowered
+        terms = set()
+        for text in lowered:
+            for chunk in text.split():
+                terms.add(chunk)
+                terms.update(tokenize(chunk))
+        for term in terms:
+            self._postings[self._term_id(term)].append(row)
+
+    def _matching_terms(self, term: str) -> List[int]:
+        """Ids of vocabulary entries that contain term as a substring."""
+        if len(term) < GRAM_SIZE:
+            return list(self._short_grams.get(term, ()))
+        gram_sets = []
+        for start in range(len(term) - GRAM_SIZE + 1):
+            gram_set = self._grams.get(term[start:start + GRAM_SIZE])
+            if not gram_set:
+                return []
+            gram_sets.append(gram_set)
+        gram_sets.sort(key=len)
+        candidates = set(gram_sets[0]).intersection(*gram_sets[1:]) if len(gram_sets) > 1 else gram_sets[0]
+        return [term_id for term_id in candidates if term in self._terms[term_id]]
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        """Vocabulary entries starting with prefix, in sorted order."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._terms)
+        start = bisect_left(self._sorted_terms, prefix)
+        terms = []
+        for term in islice(self._sorted_terms, start, None):
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def rows_for_term(self, term: str, prefix: bool = False) -> Set[int]:
+        """Rows containing term as a substring, or as a chunk/word prefix when prefix is set."""
+        if prefix:
+            term_ids = [self._term_ids[vocab_term] for vocab_term in self._prefix_terms(term)]
+        else:
+            term_ids = self._matching_terms(term)
+        rows: Set[int] = set()
+        for term_id in term_ids:
+            rows.update(self._postings[term_id])
+        return rows
+
+    def search(self, query: str, prefix: bool = False) -> Set[int]:
+        """Rows whose fields contain query, matching str.lower() substring semantics.
+
+        Multi-term queries intersect the posting lists of each term and then
+        verify the full phrase against the stored lowercased text. With prefix
+        the last term only needs to start a chunk or word, for as-you-type search.
+        """
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            return {row for row, texts in self.texts.items() if any(query in text for text in texts)}
+
+        term_rows = [self.rows_for_term(term, prefix=prefix and position == len(terms) - 1)
+                     for position, term in enumerate(terms)]
+        term_rows.sort(key=len)
+        rows = term_rows[0].intersection(*term_rows[1:]) if len(term_rows) > 1 else term_rows[0]
+        if prefix or (len(terms) == 1 and terms[0] == query):
+            return rows
+        return {row for row in rows if any(query in text for text in self.texts[row])}
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Complete a partially typed term, most frequent vocabulary entries first."""
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+        terms = self._prefix_terms(prefix)
+        terms.sort(key=lambda term: -len(self._postings[self._term_ids[term]]))
+        return terms[:limit]
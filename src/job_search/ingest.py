@@ -0,0 +1,400 @@
+"""Concurrent multi-source job ingestion.
+
+Each platform has a source adapter that pages through a feed, either a
+directory of page_N.json files or an HTTP server exposing the same layout
+(for example ``python -m http.server -d data/feeds``). Run from the repo root:
+
+    PYTHONPATH=src python -m job_search.ingest --feeds data/feeds
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from utils.text import stable_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job ids stay positive and exactly representable as JSON numbers
+JOB_ID_MASK = (1 << 52) - 1
+
+Sink = Callable[[List[Dict]], object]
+
+
+class RateLimiter:
+    """Async token bucket allowing rate requests per second, with bursts up to burst."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be made."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SourceStats:
+    """Per-source ingestion counters."""
+
+    def __init__(self, platform: str):
+        self.platform = platform
+        self.pages = 0
+        self.postings = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.failed_pages = 0
+        # Postings a sink raised on, so they may be missing from that sink's index
+        self.sink_errors = 0
+        # Set when the source was dropped after too many consecutive failed pages
+        self.abandoned = False
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def postings_per_second(self) -> float:
+        return self.postings / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'platform': self.platform,
+            'pages': self.pages,
+            'postings': self.postings,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'retries': self.retries,
+            'failed_pages': self.failed_pages,
+            'sink_errors': self.sink_errors,
+            'abandoned': self.abandoned,
+            'seconds': round(self.elapsed, 4),
+            'postings_per_second': round(self.postings_per_second, 1),
+        }
+
+
+class SourceAdapter:
+    """Pages through one platform's feed and normalizes postings to the job schema."""
+
+    platform = ''
+
+    def __init__(self, feed: str, rate_limit: float = 10.0, timeout: float = 10.0,
+                 concurrency: int = 4, max_pages: int = 10_000, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0, max_consecutive_failures: int = 5):
+        """Initialize adapter for a feed directory or base URL.
+
+        A failed or timed-out page is retried up to max_retries times with
+        jittered exponential backoff; after max_consecutive_failures pages
+        in a row still fail, the source is given up.
+        """
+        self.feed = feed
+        self.rate_limiter = RateLimiter(rate_limit, burst=concurrency)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.max_pages = max_pages
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_consecutive_failures = max_consecutive_failures
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def job_id(self, external_id) -> int:
+        """Stable integer job id derived from the platform's own posting id."""
+        return stable_hash(f"{self.platform}:{external_id}") & JOB_ID_MASK
+
+    def _read_url(self, url: str) -> Optional[Dict]:
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[Dict]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as page_file:
+            return json.load(page_file)
+
+    async def fetch_page(self, page: int) -> Optional[List[Dict]]:
+        """Fetch one page of raw postings, or None past the last page."""
+        await self.rate_limiter.acquire()
+        if self.feed.startswith(('http://', 'https://')):
+            data = await asyncio.to_thread(self._read_url, f"{self.feed.rstrip('/')}/page_{page}.json")
+        else:
+            data = await asyncio.to_thread(self._read_file, os.path.join(self.feed, f"page_{page}.json"))
+        if data is None:
+            return None
+        return data.get('results', []) if isinstance(data, dict) else list(data)
+
+    def normalize(self, raw: Dict) -> Dict:
+        """Convert a raw posting into the job dict schema used by JobSearch."""
+        raise NotImplementedError
+
+
+def _join(values) -> str:
+    if isinstance(values, (list, tuple)):
+        return ", ".join(str(value) for value in values if value)
+    return str(values or '')
+
+
+def _split_skills(value) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or '').split(',') if item.strip()]
+
+
+class LinkedInSource(SourceAdapter):
+    platform = 'LinkedIn'
+
+    def normalize(self, raw: Dict) -> Dict:
+        salary = raw.get('salary', '')
+        if isinstance(salary, dict):
+            currency = salary.get('currency', '')
+            salary = f"{currency} {salary.get('min', '')} - {currency} {salary.get('max', '')}".strip()
+        listed_at = raw.get('listedAt')
+        return {
+            'id': self.job_id(raw['jobPostingId']),
+            'title': raw['title'],
+            'company': raw.get('companyName', ''),
+            'location': raw.get('formattedLocation', ''),
+            'description': raw.get('description', ''),
+            'requirements': _split_skills(raw.get('skills')),
+            'salary_range': salary,
+            'posted_date': datetime.utcfromtimestamp(listed_at / 1000).isoformat() if listed_at else '',
+            'platform': self.platform,
+        }
+
+
+class IndeedSource(SourceAdapter):
+    platform = 'Indeed'
+
+    def normalize(self, raw: Dict) -> Dict:
+        return {
+            'id': self.job_id(raw['jobkey']),
+            'title': raw['jobtitle'],
+            'company': raw.get('company', ''),
+            'location': raw.get('formattedLocation', ''),
+            'description': raw.get('snippet', ''),
+            'requirements': _split_skills(raw.get('requirements')),
+            'salary_range': raw.get('salary', ''),
+            'posted_date': raw.get('date', ''),
+            'platform': self.platform,
+        }
+
+
+class InternshalaSource(SourceAdapter):
+    platform = 'Internshala'
+
+    def normalize(self, raw: Dict) -> Dict:
+        location = _join(raw.get('location_names'))
+        if location.lower() == 'work from home':
+            location = 'Remote'
+        return {
+            'id': self.job_id(raw['id']),
+            'title': raw['profile'],
+            'company': raw.get('company_name', ''),
+            'location': location,
+            'description': raw.get('description', ''),
+            'requirements': _split_skills(raw.get('skills_required')),
+            'salary_range': raw.get('salary', raw.get('stipend', '')),
+            'posted_date': raw.get('posted_on', ''),
+            'platform': self.platform,
+        }
+
+
+SOURCE_TYPES = {
+    'linkedin': LinkedInSource,
+    'indeed': IndeedSource,
+    'internshala': InternshalaSource,
+}
+
+
+def default_sources(feeds: str, **options) -> List[SourceAdapter]:
+    """One adapter per platform whose feed exists under a directory or base URL."""
+    sources = []
+    for name, source_type in SOURCE_TYPES.items():
+        feed = f"{feeds.rstrip('/')}/{name}" if feeds.startswith(('http://', 'https://')) else os.path.join(feeds, name)
+        if feed.startswith(('http://', 'https://')) or os.path.isdir(feed):
+            sources.append(source_type(feed, **options))
+    return sources
+
+
+_DONE = object()
+
+
+class IngestionPipeline:
+    """Fetch every source concurrently and stream normalized jobs into sinks in batches."""
+
+    def __init__(self, sources: Sequence[SourceAdapter], sinks: Sequence[Sink], batch_size: int = 500):
+        """Initialize pipeline; each sink is called with lists of at most batch_size jobs."""
+        self.sources = list(sources)
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+
+    async def _fetch(self, source: SourceAdapter, page: int,
+                     stats: SourceStats) -> Tuple[Optional[List[Dict]], bool]:
+        """Return (raw postings, reached_end) for one page, retrying failures with backoff.
+
+        Raw postings are None both past the end and when every attempt failed.
+        """
+        for attempt in range(source.max_retries + 1):
+            try:
+                raw_jobs = await asyncio.wait_for(source.fetch_page(page), source.timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                logger.warning(f"Timed out fetching {source.platform} page {page}")
+            except Exception as e:
+                stats.errors += 1
+                logger.error(f"Error fetching {source.platform} page {page}: {str(e)}")
+            else:
+                if raw_jobs is None:
+                    return None, True
+                stats.pages += 1
+                return raw_jobs, False
+            if attempt < source.max_retries:
+                stats.retries += 1
+                await asyncio.sleep(source.backoff_delay(attempt))
+        stats.failed_pages += 1
+        return None, False
+
+    async def _run_source(self, source: SourceAdapter, queue: asyncio.Queue, stats: SourceStats):
+        """Fetch pages in concurrent windows until the feed runs out or keeps failing."""
+        try:
+            page = 1
+            consecutive_failures = 0
+            while page <= source.max_pages:
+                window = range(page, min(page + source.concurrency, source.max_pages + 1))
+                results = await asyncio.gather(*(self._fetch(source, number, stats) for number in window))
+                for raw_jobs, reached_end in results:
+                    if raw_jobs is None and not reached_end:
+                        consecutive_failures += 1
+                        continue
+                    consecutive_failures = 0
+                    for raw in raw_jobs or []:
+                        try:
+                            job = source.normalize(raw)
+                        except Exception as e:
+                            stats.errors += 1
+                            logger.error(f"Error normalizing {source.platform} posting: {str(e)}")
+                            continue
+                        await queue.put(job)
+                        stats.postings += 1
+                if any(reached_end for _, reached_end in results):
+                    break
+                if consecutive_failures >= source.max_consecutive_failures:
+                    stats.abandoned = True
+                    logger.error(f"Giving up on {source.platform} after {consecutive_failures} "
+                                 f"consecutive failed pages")
+                    break
+                page += len(window)
+        finally:
+            stats.finished = time.perf_counter()
+
+    async def _flush(self, batch: List[Dict], stats: Dict[str, SourceStats]):
+        # Sinks run one batch at a time off the event loop, so fetching continues meanwhile.
+        # A failing sink loses that batch only; the other sinks and later batches still run
+        for sink in self.sinks:
+            try:
+                await asyncio.to_thread(sink, batch)
+            except Exception as e:
+                logger.error(f"Error storing a batch of {len(batch)} postings: {str(e)}")
+                for job in batch:
+                    source_stats = stats.get(job.get('platform'))
+                    if source_stats is not None:
+                        source_stats.sink_errors += 1
+
+    async def _consume(self, queue: asyncio.Queue, stats: Dict[str, SourceStats]):
+        batch: List[Dict] = []
+        while True:
+            job = await queue.get()
+            if job is _DONE:
+                break
+            batch.append(job)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, stats)
+                batch = []
+        if batch:
+            await self._flush(batch, stats)
+
+    async def run(self) -> Dict[str, SourceStats]:
+        """Ingest every source, returning per-source stats.
+
+        Producers and the consumer share one task group, so if either side
+        fails the others are cancelled instead of waiting on the full queue.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=4 * self.batch_size)
+        stats = {source.platform: SourceStats(source.platform) for source in self.sources}
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._consume(queue, stats))
+            await asyncio.gather(*(group.create_task(self._run_source(source, queue, stats[source.platform]))
+                                   for source in self.sources))
+            await queue.put(_DONE)
+        for source_stats in stats.values():
+            logger.info(f"Ingested {source_stats.postings} {source_stats.platform} postings "
+                        f"({source_stats.postings_per_second:.1f}/s)")
+        return stats
+
+
+def run_ingestion(sources: Sequence[SourceAdapter], sinks: Sequence[Sink],
+                  batch_size: int = 500) -> Dict[str, SourceStats]:
+    """Run the ingestion pipeline to completion from synchronous code."""
+    return asyncio.run(IngestionPipeline(sources, sinks, batch_size).run())
+
+
+def main():
+    from .job_search import JobSearch
+
+    parser = argparse.ArgumentParser(description="Ingest job postings from local platform feeds")
+    parser.add_argument('--feeds', default=os.path.join("data", "feeds"),
+                        help="directory or base URL holding one feed per platform")
+    parser.add_argument('--rate-limit', type=float, default=10.0, help="pages per second per source")
+    parser.add_argument('--timeout', type=float, default=10.0, help="seconds per page fetch")
+    parser.add_argument('--concurrency', type=int, default=4, help="pages in flight per source")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--retries', type=int, default=3, help="retries per failed page")
+    parser.add_argument('--max-failures', type=int, default=5,
+                        help="consecutive failed pages before a source is given up")
+    args = parser.parse_args()
+
+    job_search = JobSearch()
+    sources = default_sources(args.feeds, rate_limit=args.rate_limit, timeout=args.timeout,
+                              concurrency=args.concurrency, max_retries=args.retries,
+                              max_consecutive_failures=args.max_failures)
+    stats = run_ingestion(sources, [job_search.add_jobs], args.batch_size)
+    for source_stats in stats.values():
+        print(json.dumps(source_stats.as_dict()))
+    print(f"{len(job_search.store)} jobs searchable")
+
+
+if __name__ == "__main__":
+    main()
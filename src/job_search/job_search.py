@@ -1,17 +1,160 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator, NamedTuple, Optional, Sequence, Union
+import base64
+import hashlib
+import json
 import logging
 from datetime import datetime
+import numpy as np
+from .dedup import MinHashLSH, same_company
+from .index import TextIndex
+from .store import DateLike, JobStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class SearchPage(NamedTuple):
+    """One page of search results and the cursor for the page after it (None at the end)."""
+    jobs: List[Dict]
+    next_cursor: Optional[str]
+
+
 class JobSearch:
-    def __init__(self):
-        """Initialize job search with mock data."""
+    def __init__(self, dedup_threshold: Optional[float] = 0.5):
+        """Initialize job search with mock data.
+
+        Cross-posted jobs whose title, company and description reach
+        dedup_threshold estimated Jaccard similarity are collapsed into one
+        canonical posting; None disables deduplication.
+        """
+        self.store = JobStore()
+        self.query_index = TextIndex()
+        self.location_index = TextIndex()
+        self.dedup = MinHashLSH(threshold=dedup_threshold) if dedup_threshold is not None else None
+        # Duplicate job id -> canonical job id, and the reverse
+        self.duplicate_of: Dict[int, int] = {}
+        self._duplicates: Dict[int, List[int]] = {}
+        # Duplicate job id -> its own posting, promoted if the canonical one is removed
+        self.duplicate_jobs: Dict[int, Dict] = {}
         self.mock_jobs = self._generate_mock_jobs()
+        self.add_jobs(self.mock_jobs)
         logger.info(f"Initialized with {len(self.mock_jobs)} mock jobs")
 
+    @property
+    def jobs(self) -> List[Dict]:
+        """Live jobs in insertion order."""
+        return [self.store.jobs[row] for row in self.store.live_rows()]
+
+    @staticmethod
+    def _with_platforms(job: Dict, *platforms: str) -> Dict:
+        """Copy of job whose platforms list also includes the given platforms."""
+        merged = list(job.get('platforms') or [job.get('platform', '')])
+        for platform in platforms:
+            if platform not in merged:
+                merged.append(platform)
+        return {**job, 'platforms': merged}
+
+    def _deduplicate(self, jobs: List[Dict]) -> List[Dict]:
+        """Collapse near-duplicate postings, returning the canonical jobs to store.
+
+        Each new posting costs one MinHash signature and an LSH bucket lookup,
+        so this stays independent of corpus size for typical band collisions.
+        A duplicate's platform is added to its canonical posting's platforms.
+        """
+        pending: Dict[int, Dict] = {}
+        for job in jobs:
+            job_id = job['id']
+            if job_id in self.duplicate_of:
+                self.duplicate_jobs[job_id] = job
+                continue
+            existing = pending.get(job_id) or self.store.get(job_id)
+            if existing is not None:
+                # A canonical posting seen again keeps the platforms merged into it
+                job = self._with_platforms(job, *existing.get('platforms', []))
+                if {**existing, 'platforms': None} != {**job, 'platforms': None}:
+                    self.dedup.add(job_id, self.dedup.signature(job))
+                pending[job_id] = job
+                continue
+
+            signature = self.dedup.signature(job)
+            canonical_id = next((match for match, _ in self.dedup.query(signature)
+                                 if same_company(job, pending.get(match) or self.store.get(match))), None)
+            if canonical_id is None:
+                self.dedup.add(job_id, signature)
+                pending[job_id] = self._with_platforms(job)
+                continue
+            canonical = pending.get(canonical_id) or self.store.get(canonical_id)
+            pending[canonical_id] = self._with_platforms(canonical, job.get('platform', ''))
+            self.duplicate_of[job_id] = canonical_id
+            self._duplicates.setdefault(canonical_id, []).append(job_id)
+            self.duplicate_jobs[job_id] = job
+            logger.info(f"Job {job_id} is a duplicate of job {canonical_id}")
+        return list(pending.values())
+
+    def add_jobs(self, jobs: List[Dict]) -> int:
+        """Store new or changed jobs and index their searchable fields, lowercasing them once."""
+        if self.dedup is not None:
+            jobs = self._deduplicate(jobs)
+        return self._store_jobs(jobs)
+
+    def _store_jobs(self, jobs: List[Dict]) -> int:
+        """Append canonical jobs to the store and the text indexes."""
+        rows = self.store.append(jobs)
+        for row in rows:
+            job = self.store.jobs[row]
+            self.query_index.add(row, (job["title"], job["description"], job["company"]))
+            self.location_index.add(row, (job["location"],))
+        return len(rows)
+
+    def _with_duplicate_platforms(self, job: Dict) -> Dict:
+        """Copy of a canonical job whose platforms are its own plus those of its live duplicates."""
+        platforms = [self.duplicate_jobs[duplicate_id].get('platform', '')
+                     for duplicate_id in self._duplicates.get(job['id'], [])]
+        return self._with_platforms({**job, 'platforms': None}, *platforms)
+
+    def remove_jobs(self, job_ids: List[int]) -> int:
+        """Remove expired or withdrawn jobs from search results.
+
+        Removing a canonical posting promotes its first remaining duplicate
+        in its place; removing a duplicate drops its platform from the
+        canonical posting.
+        """
+        job_ids = list(job_ids)
+        removed = set(job_ids)
+        changed: Dict[int, Dict] = {}
+        for job_id in job_ids:
+            canonical_id = self.duplicate_of.pop(job_id, None)
+            self.duplicate_jobs.pop(job_id, None)
+            if canonical_id is not None:
+                self._duplicates[canonical_id].remove(job_id)
+                if not self._duplicates[canonical_id]:
+                    del self._duplicates[canonical_id]
+                if canonical_id not in removed:
+                    changed.setdefault(canonical_id, self.store.get(canonical_id))
+
+            duplicate_ids = [duplicate_id for duplicate_id in self._duplicates.pop(job_id, [])
+                             if duplicate_id not in removed]
+            if not duplicate_ids:
+                continue
+            promoted_id, rest = duplicate_ids[0], duplicate_ids[1:]
+            promoted = self.duplicate_jobs.pop(promoted_id)
+            del self.duplicate_of[promoted_id]
+            for duplicate_id in rest:
+                self.duplicate_of[duplicate_id] = promoted_id
+            if rest:
+                self._duplicates[promoted_id] = rest
+            if self.dedup is not None:
+                self.dedup.add(promoted_id, self.dedup.signature(promoted))
+            changed[promoted_id] = promoted
+            logger.info(f"Job {promoted_id} is now canonical in place of removed job {job_id}")
+
+        if self.dedup is not None:
+            self.dedup.remove(job_ids)
+        count = self.store.remove(job_ids)
+        self._store_jobs([self._with_duplicate_platforms(job) for job_id, job in changed.items()
+                          if job_id not in removed and job is not None])
+        return count
+
     def _generate_mock_jobs(self) -> List[Dict]:
         """Generate mock job data for testing."""
         return [
@@ -209,43 +352,134 @@ class JobSearch:
             }
         ]
 
-    def search_jobs(self, query: str = None, location: str = None) -> List[Dict]:
-        """Search for jobs based on query and location."""
+    def _match_rows(self, query: str = None, location: str = None, prefix: bool = False,
+                    **facets) -> np.ndarray:
+        """Sorted row numbers of live jobs matching the query, location and facets."""
+        mask = self.store.facet_mask(**facets)
+
+        if query:
+            mask &= self._rows_mask(self.query_index.search(query, prefix=prefix))
+            logger.info(f"Found {int(mask.sum())} jobs matching query")
+
+        if location:
+            mask &= self._rows_mask(self.location_index.search(location))
+            logger.info(f"Found {int(mask.sum())} jobs matching location")
+
+        return np.flatnonzero(mask)
+
+    def search_jobs(self, query: str = None, location: str = None, prefix: bool = False,
+                    platform: Optional[Union[str, Sequence[str]]] = None,
+                    posted_after: Optional[DateLike] = None, posted_before: Optional[DateLike] = None,
+                    min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+                    salary_currency: Optional[str] = None, remote: Optional[bool] = None,
+                    sort_by: Optional[str] = None) -> List[Dict]:
+        """Search for jobs based on query, location and facet filters.
+
+        Matching is a case-insensitive substring match on title, description
+        or company (query) and on location. With prefix, the last query word
+        only needs to start a word, for as-you-type search. Facets are applied
+        as vectorized masks over the job columns; salary bounds are annualized
+        amounts parsed at ingest. sort_by 'salary' or '-salary' orders results
+        by salary and requires salary_currency, since amounts in different
+        currencies do not compare. The returned dicts are the stored ones,
+        not copies.
+        """
         try:
-            filtered_jobs = self.mock_jobs
             logger.info(f"Searching jobs with query: {query}, location: {location}")
+            if sort_by not in (None, 'salary', '-salary'):
+                raise ValueError(f"Unsupported sort: {sort_by}")
+            if sort_by is not None and salary_currency is None:
+                raise ValueError("Sorting by salary requires salary_currency")
+            rows = self._match_rows(query, location, prefix, platform=platform,
+                                    posted_after=posted_after, posted_before=posted_before,
+                                    min_salary=min_salary, max_salary=max_salary,
+                                    salary_currency=salary_currency, remote=remote)
+            if sort_by is not None:
+                rows = self.store.order_by_salary(rows, descending=sort_by == '-salary')
+            jobs = self.store.jobs
+            return [jobs[row] for row in rows.tolist()]
+
+        except Exception as e:
+            logger.error(f"Error searching jobs: {str(e)}")
+            raise
+
+    @staticmethod
+    def _search_key(query, location, prefix, facets: Dict) -> str:
+        """Fingerprint of a search so a cursor cannot be replayed against a different one."""
+        params = json.dumps([query, location, prefix, facets], sort_keys=True, default=str)
+        return hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _encode_cursor(row: int, search_key: str) -> str:
+        payload = json.dumps({'row': int(row), 'search': search_key}).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, search_key: str) -> int:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            row, cursor_key = int(payload['row']), payload['search']
+        except Exception:
+            raise ValueError("Invalid search cursor")
+        if cursor_key != search_key:
+            raise ValueError("Search cursor belongs to a different search")
+        return row
 
-            if query:
-                query = query.lower()
-                filtered_jobs = [
-                    job for job in filtered_jobs
-                    if query in job["title"].lower() or
-                    query in job["description"].lower() or
-                    query in job["company"].lower()
-                ]
-                logger.info(f"Found {len(filtered_jobs)} jobs matching query")
-
-            if location:
-                location = location.lower()
-                filtered_jobs = [
-                    job for job in filtered_jobs
-                    if location in job["location"].lower()
-                ]
-                logger.info(f"Found {len(filtered_jobs)} jobs matching location")
-
-            return filtered_jobs
+    def iter_search(self, query: str = None, location: str = None, page_size: int = 20,
+                    cursor: Optional[str] = None, prefix: bool = False, **facets) -> Iterator[SearchPage]:
+        """Yield result pages lazily in stable insertion order, starting after cursor.
 
+        Each page carries an opaque cursor that resumes the same search from
+        the next page, in this call or a later one. Jobs added after the
+        search started appear on later pages; they never shift earlier ones.
+        Facet keyword arguments are the same as for search_jobs.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        search_key = self._search_key(query, location, prefix, facets)
+        after = self._decode_cursor(cursor, search_key) if cursor else -1
+        try:
+            rows = self._match_rows(query, location, prefix, **facets)
         except Exception as e:
             logger.error(f"Error searching jobs: {str(e)}")
             raise
 
+        start = int(np.searchsorted(rows, after, side='right'))
+        jobs = self.store.jobs
+        for begin in range(start, len(rows), page_size):
+            page_rows = rows[begin:begin + page_size].tolist()
+            has_more = begin + page_size < len(rows)
+            next_cursor = self._encode_cursor(page_rows[-1], search_key) if has_more else None
+            yield SearchPage([jobs[row] for row in page_rows], next_cursor)
+
+    def search_page(self, query: str = None, location: str = None, page_size: int = 20,
+                    cursor: Optional[str] = None, prefix: bool = False, **facets) -> SearchPage:
+        """Fetch a single page of results, e.g. for an API handler."""
+        return next(self.iter_search(query, location, page_size, cursor, prefix, **facets),
+                    SearchPage([], None))
+
+    def _rows_mask(self, rows) -> np.ndarray:
+        """Boolean row mask from a set of matching row numbers."""
+        mask = np.zeros(len(self.store.jobs), dtype=bool)
+        if rows:
+            mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+        return mask
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Suggest search terms completing a partially typed word."""
+        try:
+            return self.query_index.suggest(prefix, limit)
+        except Exception as e:
+            logger.error(f"Error suggesting search terms: {str(e)}")
+            raise
+
     def get_job_details(self, job_id: int) -> Dict:
         """Get detailed information about a specific job."""
         try:
-            for job in self.mock_jobs:
-                if job["id"] == job_id:
-                    return job
-            raise ValueError(f"Job with ID {job_id} not found")
+            job = self.store.get(self.duplicate_of.get(job_id, job_id))
+            if job is None:
+                raise ValueError(f"Job with ID {job_id} not found")
+            return job
         except Exception as e:
             logger.error(f"Error getting job details: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
@@ -0,0 +1,81 @@
+import math
+import re
+from typing import NamedTuple, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AMOUNT_PATTERN = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)\s*(k|lpa|lakhs?|lacs?|l|crores?|cr|mn|m)?(?![a-z])"
+)
+
+# Text between the two ends of a range, optionally repeating the currency: "50k - $60k", "12 to 18 LPA"
+RANGE_SEPARATOR = re.compile(r"\s*(?:-|–|—|to)\s*(?:[$₹€£]|rs\.?|inr|usd|eur|gbp)?\s*")
+
+# Multipliers for amount suffixes; LPA is lakhs per annum
+UNIT_MULTIPLIERS = {
+    'k': 1e3, 'm': 1e6, 'mn': 1e6,
+    'l': 1e5, 'lpa': 1e5, 'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5,
+    'cr': 1e7, 'crore': 1e7, 'crores': 1e7,
+}
+
+CURRENCY_PATTERNS = [
+    ('INR', re.compile(r"₹|\binr\b|\brs\.?|\blpa\b|\blakhs?\b|\bcr(?:ores?)?\b")),
+    ('USD', re.compile(r"\$|\busd\b")),
+    ('EUR', re.compile(r"€|\beur\b")),
+    ('GBP', re.compile(r"£|\bgbp\b")),
+]
+
+PERIOD_PATTERNS = [
+    ('hour', re.compile(r"/\s*h(?:ou)?r\b|\bper\s+hour\b|\bhourly\b|\ban\s+hour\b")),
+    ('week', re.compile(r"/\s*w(?:ee)?k\b|\bper\s+week\b|\bweekly\b|\ba\s+week\b")),
+    ('month', re.compile(r"/\s*mo(?:nth)?\b|\bper\s+month\b|\bmonthly\b|\ba\s+month\b|\bp\.?m\.?$")),
+    ('year', re.compile(r"/\s*y(?:ea)?r\b|\bper\s+(?:year|annum)\b|\bannual(?:ly)?\b|\ba\s+year\b|\blpa\b|\bp\.?a\.?\b")),
+]
+
+# Working time used to compare hourly, weekly and monthly pay with annual salaries
+PERIODS_PER_YEAR = {'hour': 2080.0, 'week': 52.0, 'month': 12.0, 'year': 1.0}
+
+
+class SalaryRange(NamedTuple):
+    """Salary bounds per period in full currency units; NaN bounds when absent."""
+    min: float
+    max: float
+    currency: Optional[str]
+    period: str
+
+    @property
+    def annual_min(self) -> float:
+        return self.min * PERIODS_PER_YEAR[self.period]
+
+    @property
+    def annual_max(self) -> float:
+        return self.max * PERIODS_PER_YEAR[self.period]
+
+
+def parse_salary(salary_range: Optional[str]) -> SalaryRange:
+    """Parse a free-text salary such as "$120k - $150k", "₹18 - 26 LPA" or "$45/hr".
+
+    A unit suffix on one end of a range applies to the other end when it
+    has none, so "12-18 LPA" means 12 to 18 lakhs; amounts elsewhere in the
+    text keep their own unit, and percentages ("+ 10% bonus") are ignored.
+    Indian digit grouping ("₹25,00,000") and US grouping are both read by
+    dropping commas.
+    """
+    text = str(salary_range or '').lower().strip()
+    currency = next((code for code, pattern in CURRENCY_PATTERNS if pattern.search(text)), None)
+    period = next((name for name, pattern in PERIOD_PATTERNS if pattern.search(text)), 'year')
+
+    matches = [match for match in AMOUNT_PATTERN.finditer(text)
+               if not text[match.end():].lstrip().startswith('%')]
+    if not matches:
+        return SalaryRange(math.nan, math.nan, currency, period)
+    units = [match.group(2) or '' for match in matches]
+    for low in range(len(matches) - 1):
+        if RANGE_SEPARATOR.fullmatch(text, matches[low].end(), matches[low + 1].start()):
+            units[low], units[low + 1] = units[low] or units[low + 1], units[low + 1] or units[low]
+    amounts = [float(match.group(1).replace(',', '')) * UNIT_MULTIPLIERS.get(unit, 1.0)
+               for match, unit in zip(matches, units)]
+    return SalaryRange(min(amounts), max(amounts), currency, period)
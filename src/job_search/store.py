@@ -0,0 +1,234 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+from .salary import SalaryRange, parse_salary
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, datetime, np.datetime64]
+
+
+def to_datetime64(value: Optional[DateLike]) -> np.datetime64:
+    """Convert an ISO string or datetime to second-resolution datetime64, NaT when invalid."""
+    if value is None or (isinstance(value, str) and not value):
+        return np.datetime64('NaT', 's')
+    try:
+        return np.datetime64(value, 's')
+    except (ValueError, TypeError):
+        return np.datetime64('NaT', 's')
+
+
+class JobStore:
+    """Row-oriented job list with an id -> row map and NumPy columns for facet filtering.
+
+    Rows are append-only: replacing a job appends a new row and marks the old
+    one dead, so row numbers handed to other indexes stay valid.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty store with preallocated column capacity."""
+        self.jobs: List[Dict] = []
+        self.row_of: Dict[int, int] = {}
+        self.platforms: List[str] = []
+        self._platform_codes: Dict[str, int] = {}
+        # One boolean column per platform code: rows listed on that platform,
+        # covering every entry of a merged job's platforms
+        self.listed_on: List[np.ndarray] = []
+        self.salaries: List[SalaryRange] = []
+        self.currencies: List[str] = []
+        self._currency_codes: Dict[str, int] = {}
+        # (annual_min, rows, annual_max, rows) sorted by salary, rebuilt after appends
+        self._salary_sorted: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._capacity = 0
+        self.live = np.zeros(0, dtype=bool)
+        self.platform = np.zeros(0, dtype=np.int32)
+        self.posted = np.zeros(0, dtype='datetime64[s]')
+        self.salary_min = np.zeros(0, dtype=np.float64)
+        self.salary_max = np.zeros(0, dtype=np.float64)
+        self.currency = np.zeros(0, dtype=np.int32)
+        self.remote = np.zeros(0, dtype=bool)
+        self._grow(capacity)
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self.row_of
+
+    def _grow(self, capacity: int):
+        """Resize every column to at least capacity rows, doubling to amortize appends."""
+        if capacity <= self._capacity:
+            return
+        capacity = max(capacity, 2 * self._capacity)
+        for name in ('live', 'platform', 'posted', 'salary_min', 'salary_max', 'currency', 'remote'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        for code, column in enumerate(self.listed_on):
+            grown = np.zeros(capacity, dtype=bool)
+            grown[:len(column)] = column
+            self.listed_on[code] = grown
+        self._capacity = capacity
+
+    def _platform_code(self, platform: str) -> int:
+        code = self._platform_codes.get(platform)
+        if code is None:
+            code = len(self.platforms)
+            self._platform_codes[platform] = code
+            self.platforms.append(platform)
+            self.listed_on.append(np.zeros(self._capacity, dtype=bool))
+        return code
+
+    def _currency_code(self, currency: Optional[str]) -> int:
+        if currency is None:
+            return -1
+        code = self._currency_codes.get(currency)
+        if code is None:
+            code = len(self.currencies)
+            self._currency_codes[currency] = code
+            self.currencies.append(currency)
+        return code
+
+    def _fill_row(self, row: int, job: Dict):
+        """Write one job's facet values into the columns."""
+        self.live[row] = True
+        self.platform[row] = self._platform_code(job.get('platform', ''))
+        for platform in job.get('platforms') or [job.get('platform', '')]:
+            self.listed_on[self._platform_code(platform)][row] = True
+        self.posted[row] = to_datetime64(job.get('posted_date'))
+        salary = parse_salary(job.get('salary_range'))
+        self.salaries.append(salary)
+        self.salary_min[row], self.salary_max[row] = salary.annual_min, salary.annual_max
+        self.currency[row] = self._currency_code(salary.currency)
+        self.remote[row] = 'remote' in str(job.get('location', '')).lower()
+
+    def append(self, jobs: Iterable[Dict]) -> List[int]:
+        """Add jobs, returning the rows that were written.
+
+        Jobs whose id is already stored are skipped when unchanged and
+        otherwise replace the old row.
+        """
+        rows = []
+        for job in jobs:
+            job_id = job['id']
+            old_row = self.row_of.get(job_id)
+            if old_row is not None:
+                if self.jobs[old_row] == job:
+                    continue
+                self.live[old_row] = False
+            row = len(self.jobs)
+            self._grow(row + 1)
+            self.jobs.append(job)
+            self.row_of[job_id] = row
+            self._fill_row(row, job)
+            rows.append(row)
+        if rows:
+            self._salary_sorted = None
+        return rows
+
+    def remove(self, job_ids: Iterable[int]) -> int:
+        """Mark jobs as removed, ignoring unknown ids."""
+        removed = 0
+        for job_id in job_ids:
+            row = self.row_of.pop(job_id, None)
+            if row is not None:
+                self.live[row] = False
+                removed += 1
+        return removed
+
+    def get(self, job_id) -> Optional[Dict]:
+        """Return the job with this id in O(1), or None."""
+        row = self.row_of.get(job_id)
+        return None if row is None else self.jobs[row]
+
+    def salary(self, job_id) -> Optional[SalaryRange]:
+        """Parsed salary of the job with this id, or None."""
+        row = self.row_of.get(job_id)
+        return None if row is None else self.salaries[row]
+
+    def _sorted_salaries(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Annualized salary bounds in ascending order with their rows; rows without a salary are left out."""
+        if self._salary_sorted is None:
+            n = len(self.jobs)
+            columns = []
+            for column in (self.salary_min[:n], self.salary_max[:n]):
+                rows = np.flatnonzero(~np.isnan(column))
+                rows = rows[np.argsort(column[rows], kind='stable')]
+                columns.extend((column[rows], rows))
+            self._salary_sorted = tuple(columns)
+        return self._salary_sorted
+
+    def salary_range_mask(self, min_salary: Optional[float] = None,
+                          max_salary: Optional[float] = None) -> np.ndarray:
+        """Rows with annual salary_min >= min_salary and salary_max <= max_salary, via binary search."""
+        n = len(self.jobs)
+        mask = np.ones(n, dtype=bool)
+        min_values, min_rows, max_values, max_rows = self._sorted_salaries()
+        if min_salary is not None:
+            bound = np.zeros(n, dtype=bool)
+            bound[min_rows[np.searchsorted(min_values, min_salary, side='left'):]] = True
+            mask &= bound
+        if max_salary is not None:
+            bound = np.zeros(n, dtype=bool)
+            bound[max_rows[:np.searchsorted(max_values, max_salary, side='right')]] = True
+            mask &= bound
+        return mask
+
+    def order_by_salary(self, rows: np.ndarray, descending: bool = False) -> np.ndarray:
+        """Reorder rows by annual salary (salary_min ascending, salary_max descending).
+
+        Amounts are compared as parsed, so pass rows already filtered to one
+        currency. Rows without a parsed salary keep their order and go last.
+        """
+        n = len(self.jobs)
+        selected = np.zeros(n, dtype=bool)
+        selected[rows] = True
+        _, min_rows, _, max_rows = self._sorted_salaries()
+        ordered = max_rows[::-1] if descending else min_rows
+        ordered = ordered[selected[ordered]]
+        selected[ordered] = False
+        return np.concatenate([ordered, np.flatnonzero(selected)])
+
+    def live_rows(self) -> np.ndarray:
+        """Row numbers of every stored job, in insertion order."""
+        return np.flatnonzero(self.live[:len(self.jobs)])
+
+    def facet_mask(self, platform: Optional[Union[str, Sequence[str]]] = None,
+                   posted_after: Optional[DateLike] = None, posted_before: Optional[DateLike] = None,
+                   min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+                   salary_currency: Optional[str] = None, remote: Optional[bool] = None) -> np.ndarray:
+        """Boolean mask over rows for the given facets, evaluated column-wise.
+
+        A job matches platform when any of its platforms does, so a posting
+        merged from several boards is found under each of them. Salary
+        filters keep jobs whose annualized range lies inside [min_salary,
+        max_salary], in each job's own currency; combine them with
+        salary_currency to compare like with like. Jobs without a parseable
+        salary or date never match those facets.
+        """
+        n = len(self.jobs)
+        mask = self.live[:n].copy()
+        if platform is not None:
+            names = [platform] if isinstance(platform, str) else list(platform)
+            listed = np.zeros(n, dtype=bool)
+            for name in names:
+                code = self._platform_codes.get(name)
+                if code is not None:
+                    listed |= self.listed_on[code][:n]
+            mask &= listed
+        if posted_after is not None:
+            mask &= self.posted[:n] >= to_datetime64(posted_after)
+        if posted_before is not None:
+            mask &= self.posted[:n] <= to_datetime64(posted_before)
+        if min_salary is not None or max_salary is not None:
+            mask &= self.salary_range_mask(min_salary, max_salary)
+        if salary_currency is not None:
+            mask &= self.currency[:n] == self._currency_codes.get(salary_currency, -2)
+        if remote is not None:
+            mask &= self.remote[:n] == remote
+        return mask
@@ -0,0 +1,45 @@
+from typing import Optional
+import logging
+
+import google.generativeai as genai
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """Source of model objects for LLMClient.
+
+    A model must provide generate_content(prompt, stream=False, **kwargs)
+    and async generate_content_async(prompt, **kwargs) like
+    genai.GenerativeModel. Responses expose .text; streamed responses are
+    iterables of chunks that expose .text. Retryable failures raise the
+    google.api_core exceptions in client.RETRYABLE_ERRORS.
+    """
+
+    name = 'base'
+    requires_api_key = False
+
+    def model(self, model_name: str):
+        """Create the model object for model_name; LLMClient caches the result."""
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini models via google.generativeai."""
+
+    name = 'gemini'
+    requires_api_key = True
+
+    def __init__(self, api_key: Optional[str]):
+        """Initialize backend; the API is configured when the first model is created."""
+        self.api_key = api_key
+        self._configured = False
+
+    def model(self, model_name: str) -> genai.GenerativeModel:
+        if not self._configured:
+            genai.configure(api_key=self.api_key)
+            self._configured = True
+        logger.info(f"Using Gemini model: {model_name}")
+        return genai.GenerativeModel(model_name)
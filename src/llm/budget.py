@@ -0,0 +1,60 @@
+import re
+from typing import List, NamedTuple, Sequence
+import logging
+
+from .client import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+class PromptReport(NamedTuple):
+    """Token estimate of a compacted prompt against the prompt it replaces."""
+    prompt_tokens: int
+    full_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.full_tokens - self.prompt_tokens)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into bullet lines and sentences, dropping bullet markers."""
+    parts = (part.strip().lstrip("-•*· ").strip() for part in SENTENCE_PATTERN.split(str(text or '')))
+    return [part for part in parts if part]
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Leading part of text within budget tokens, cut at the last line or sentence break that fits."""
+    if estimate_tokens(text) <= budget:
+        return text
+    head = text[:max(0, budget) * 4]
+    breaks = [match.start() for match in SENTENCE_PATTERN.finditer(head)]
+    return head[:breaks[-1] if breaks else len(head)].rstrip()
+
+
+def fit_texts(texts: Sequence[str], budget: int) -> List[str]:
+    """Truncate texts to share budget tokens, giving what short texts leave unused to longer ones."""
+    fitted = list(texts)
+    remaining = budget
+    order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+    for position, index in enumerate(order):
+        share = remaining // (len(order) - position)
+        fitted[index] = truncate_to_tokens(texts[index], share)
+        remaining -= estimate_tokens(fitted[index])
+    return fitted
+
+
+def select_within_budget(items: Sequence[str], scores: Sequence[float], budget: int) -> List[int]:
+    """Indices of the highest-scoring items whose total tokens fit in budget, in original order."""
+    chosen = []
+    used = 0
+    for index in sorted(range(len(items)), key=lambda index: -scores[index]):
+        cost = estimate_tokens(items[index]) + 1
+        if used + cost <= budget:
+            chosen.append(index)
+            used += cost
+    return sorted(chosen)
@@ -0,0 +1,327 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Awaitable, Dict, Iterator, Optional, Tuple
+import logging
+
+from google.api_core import exceptions as api_exceptions
+
+from .backends import GeminiBackend, LLMBackend
+from .fake import FakeBackend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60.0
+
+# Rate limiting and transient server errors are retried with backoff
+RETRYABLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.TooManyRequests,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+)
+
+# Process-wide cap on in-flight model calls, shared by every client
+MAX_CONCURRENT_CALLS = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+_call_slots = threading.BoundedSemaphore(MAX_CONCURRENT_CALLS)
+
+
+# Values of LLM_BACKEND
+LLM_BACKENDS = ('gemini', 'fake')
+
+
+class LLMTimeoutError(TimeoutError):
+    """A model call did not finish within its timeout."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) when the API reports none."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def response_text(response) -> str:
+    """Response text, or '' when the response was blocked or empty."""
+    try:
+        return response.text or ''
+    except Exception:
+        return ''
+
+
+def token_counts(prompt: str, response) -> Tuple[int, int]:
+    """(prompt, output) token counts, from usage metadata when the SDK reports it."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'prompt_token_count', None):
+        return usage.prompt_token_count, getattr(usage, 'candidates_token_count', 0) or 0
+    return estimate_tokens(prompt), estimate_tokens(response_text(response))
+
+
+class LLMStats:
+    """Thread-safe call, latency and token counters."""
+
+    def __init__(self, history: int = 1000):
+        """Initialize counters, keeping the last history calls for latency percentiles."""
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.total_latency = 0.0
+        self.recent = deque(maxlen=history)
+
+    def record(self, model_name: str, latency: float, prompt_tokens: int, output_tokens: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.total_latency += latency
+            self.recent.append((model_name, latency, prompt_tokens, output_tokens))
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            latencies = sorted(call[1] for call in self.recent)
+        percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'mean_latency': self.total_latency / self.calls if self.calls else 0.0,
+            'p50_latency': percentile(0.5),
+            'p99_latency': percentile(0.99),
+        }
+
+
+def default_backend(api_key: Optional[str]) -> LLMBackend:
+    """Backend named by the LLM_BACKEND environment variable, Gemini by default."""
+    name = os.getenv('LLM_BACKEND', 'gemini').strip().lower()
+    if name == 'gemini':
+        return GeminiBackend(api_key)
+    if name == 'fake':
+        return FakeBackend.from_env()
+    raise ValueError(f"Unknown LLM backend '{name}'; expected one of {LLM_BACKENDS}")
+
+
+class LLMClient:
+    """Shared LLM client with lazy model construction, timeouts, retries and accounting.
+
+    Models come from backend, which defaults to default_backend(api_key).
+    Nothing touches the network until the first call. Every call holds one
+    of the process-wide MAX_CONCURRENT_CALLS slots while it runs.
+    """
+
+    def __init__(self, api_key: Optional[str], timeout: float = DEFAULT_TIMEOUT, max_retries: int = 4,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0, backend: Optional[LLMBackend] = None):
+        """Initialize client; models are created on first use."""
+        self.api_key = api_key
+        self.backend = backend or default_backend(api_key)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = LLMStats()
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def model(self, model_name: str):
+        """Return the backend's model, constructing it on first use."""
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self.backend.model(model_name)
+                self._models[model_name] = model
+            return model
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(MAX_CONCURRENT_CALLS, thread_name_prefix='llm')
+            return self._executor
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """Background event loop for async calls, started on first use.
+
+        The async Gemini client binds to the loop it first runs on, so every
+        async call goes through this one long-lived loop.
+        """
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='llm-loop', daemon=True).start()
+            return self._loop
+
+    def submit(self, coroutine: Awaitable) -> Future:
+        """Schedule a coroutine on the client's event loop from synchronous code."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop())
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _run(call, *args, **kwargs):
+        # The slot is taken by the caller and freed only when the call really ends,
+        # so a call abandoned on timeout still counts against the limit
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _call_slots.release()
+
+    def generate(self, prompt: str, model_name: str, timeout: Optional[float] = None, **kwargs):
+        """Call generate_content with a timeout, retrying rate limits with jittered backoff."""
+        model = self.model(model_name)
+        timeout = timeout or self.timeout
+        for attempt in range(self.max_retries + 1):
+            _call_slots.acquire()
+            started = time.perf_counter()
+            future = self._pool().submit(self._run, model.generate_content, prompt, **kwargs)
+            try:
+                response = future.result(timeout=timeout)
+            except FutureTimeout:
+                self.stats.count('timeouts')
+                raise LLMTimeoutError(f"{model_name} call timed out after {timeout:g}s")
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.stats.count('failures')
+                    raise
+                delay = self.backoff_delay(attempt)
+                self.stats.count('retries')
+                logger.warning(f"{model_name} call failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except Exception:
+                self.stats.count('failures')
+                raise
+            self.stats.record(model_name, time.perf_counter() - started, *token_counts(prompt, response))
+            return response
+
+    def stream(self, prompt: str, model_name: str, timeout: Optional[float] = None, **kwargs) -> Iterator[str]:
+        """Stream generated text chunk by chunk.
+
+        Rate limits are retried with backoff until the first chunk arrives;
+        after that, errors propagate to the caller. timeout bounds the wait
+        for each chunk, and the call holds a concurrency slot until the
+        stream ends or is closed.
+        """
+        model = self.model(model_name)
+        timeout = timeout or self.timeout
+        pool = self._pool()
+        for attempt in range(self.max_retries + 1):
+            _call_slots.acquire()
+            started = time.perf_counter()
+            # generate_content(stream=True) returns once the first chunk is in
+            pending = pool.submit(model.generate_content, prompt, stream=True, **kwargs)
+            try:
+                response = pending.result(timeout=timeout)
+                break
+            except FutureTimeout:
+                # Like _run, keep the slot until the abandoned call really ends
+                pending.add_done_callback(lambda _: _call_slots.release())
+                self.stats.count('timeouts')
+                raise LLMTimeoutError(f"{model_name} call timed out after {timeout:g}s")
+            except RETRYABLE_ERRORS as e:
+                _call_slots.release()
+                if attempt == self.max_retries:
+                    self.stats.count('failures')
+                    raise
+                delay = self.backoff_delay(attempt)
+                self.stats.count('retries')
+                logger.warning(f"{model_name} call failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except Exception:
+                _call_slots.release()
+                self.stats.count('failures')
+                raise
+
+        output = []
+        try:
+            chunks = iter(response)
+            while True:
+                pending = pool.submit(next, chunks, None)
+                try:
+                    chunk = pending.result(timeout=timeout)
+                except FutureTimeout:
+                    self.stats.count('timeouts')
+                    raise LLMTimeoutError(f"{model_name} stream stalled for {timeout:g}s")
+                if chunk is None:
+                    break
+                text = response_text(chunk)
+                if text:
+                    output.append(text)
+                    yield text
+            self.stats.record(model_name, time.perf_counter() - started,
+                              estimate_tokens(prompt), estimate_tokens("".join(output)))
+        except LLMTimeoutError:
+            raise
+        except Exception:
+            self.stats.count('failures')
+            raise
+        finally:
+            # A stalled chunk read is still running; it frees the slot when it returns
+            pending.add_done_callback(lambda _: _call_slots.release())
+
+    async def generate_async(self, prompt: str, model_name: str, timeout: Optional[float] = None, **kwargs):
+        """Async generate_content with the same timeout, retry, concurrency and accounting as generate."""
+        model = self.model(model_name)
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            # Waiting for a slot blocks, so it happens off the event loop
+            acquired = loop.run_in_executor(None, _call_slots.acquire)
+            try:
+                await asyncio.shield(acquired)
+            except asyncio.CancelledError:
+                acquired.add_done_callback(lambda _: _call_slots.release())
+                raise
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(model.generate_content_async(prompt, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                self.stats.count('timeouts')
+                raise LLMTimeoutError(f"{model_name} call timed out after {timeout:g}s")
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.stats.count('failures')
+                    raise
+                delay = self.backoff_delay(attempt)
+                self.stats.count('retries')
+                logger.warning(f"{model_name} call failed ({str(e)}), retrying in {delay:.1f}s")
+            except Exception:
+                self.stats.count('failures')
+                raise
+            else:
+                self.stats.record(model_name, time.perf_counter() - started, *token_counts(prompt, response))
+                return response
+            finally:
+                # A cancelled or timed-out async call has really stopped, so its slot is free
+                _call_slots.release()
+            await asyncio.sleep(delay)
+
+
+_clients: Dict[Optional[str], LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: Optional[str]) -> LLMClient:
+    """Return the process-wide client for an API key, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = LLMClient(api_key)
+            _clients[api_key] = client
+        return client
@@ -0,0 +1,308 @@
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+from google.api_core import exceptions as api_exceptions
+
+from utils.text import stable_hash, tokenize
+from .backends import LLMBackend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Distribution -> default parameters, in the order they are given in a spec
+LATENCY_DISTRIBUTIONS = {
+    'constant': (0.5,),            # seconds
+    'uniform': (0.2, 1.0),         # low, high
+    'normal': (0.5, 0.15),         # mean, standard deviation
+    'lognormal': (0.5, 0.5),       # median, sigma
+    'exponential': (0.5,),         # mean
+}
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s-]{8,}\d")
+NAME_PATTERN = re.compile(r"^[A-Z][a-z]+(?: [A-Z][a-z]+){1,3}$")
+
+FAKE_SKILLS = ('Python', 'SQL', 'Docker', 'AWS', 'React', 'Machine Learning', 'Kafka', 'Java',
+               'Kubernetes', 'Pandas', 'Git', 'FastAPI', 'PostgreSQL', 'TypeScript')
+FAKE_FIRST_NAMES = ('Aarav', 'Diya', 'Kabir', 'Meera', 'Rohan', 'Sara', 'Vikram', 'Zoya')
+FAKE_LAST_NAMES = ('Shah', 'Iyer', 'Mehta', 'Rao', 'Kapoor', 'Nair', 'Gupta', 'Das')
+FAKE_COMPANIES = ('Infosys', 'Flipkart', 'Zoho', 'Freshworks', 'Razorpay', 'Swiggy', 'TCS', 'Zomato')
+FAKE_ROLES = ('Software Engineer', 'Data Analyst', 'Backend Developer', 'ML Engineer', 'Intern')
+FAKE_DEGREES = ('B.Tech in Computer Science', 'B.Sc in Mathematics', 'M.Tech in Data Science', 'BCA')
+FAKE_INSTITUTIONS = ('IIT Bombay', 'NIT Trichy', 'BITS Pilani', 'Delhi University', 'VIT Vellore')
+FAKE_PROJECTS = ('Expense Tracker', 'Job Recommender', 'Chat Server', 'Image Classifier', 'URL Shortener')
+FAKE_LETTER_SENTENCES = (
+    "In my recent work I have delivered production features end to end, from design to deployment.",
+    "I enjoy turning ambiguous problems into simple, well-tested systems.",
+    "My experience with {skills} maps closely to what your team is looking for.",
+    "I have collaborated with product and design teams to ship features used by thousands of users.",
+    "I am comfortable owning services in production and improving them with data.",
+    "Your work at {company} stands out to me, and I would be proud to contribute to it.",
+)
+
+
+class LatencyDistribution:
+    """Random call latency in seconds drawn from a named distribution."""
+
+    def __init__(self, kind: str = 'lognormal', *params: float):
+        """Initialize distribution; params default to LATENCY_DISTRIBUTIONS[kind]."""
+        if kind not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{kind}'; expected one of {sorted(LATENCY_DISTRIBUTIONS)}")
+        defaults = LATENCY_DISTRIBUTIONS[kind]
+        params = tuple(float(param) for param in params) or defaults
+        if len(params) != len(defaults):
+            raise ValueError(f"{kind} latency takes {len(defaults)} parameters, got {len(params)}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyDistribution':
+        """Parse 'kind' or 'kind:p1,p2', e.g. 'lognormal:0.8,0.4' or 'constant:0'."""
+        kind, _, params = spec.partition(':')
+        return cls(kind.strip(), *(float(param) for param in params.split(',') if param.strip()))
+
+    def sample(self, rng: random.Random) -> float:
+        params = self.params
+        if self.kind == 'constant':
+            return params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*params)
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(*params))
+        if self.kind == 'lognormal':
+            return params[0] * math.exp(rng.gauss(0.0, params[1]))
+        return rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{param:g}' for param in self.params)}"
+
+
+class FakeResponse:
+    """Generated text in the shape of a Gemini response."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """Streamed response yielding chunks chunk_delay seconds apart, the first at once."""
+
+    def __init__(self, chunks: List[str], chunk_delay: float):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def __iter__(self) -> Iterator[FakeResponse]:
+        for position, chunk in enumerate(self.chunks):
+            if position:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse(chunk)
+
+
+class FakeModel:
+    """Stand-in for genai.GenerativeModel backed by a FakeBackend."""
+
+    def __init__(self, backend: 'FakeBackend', model_name: str):
+        self.backend = backend
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        latency, error = self.backend.draw_call()
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        chunks = self.backend.chunks(self.backend.respond(prompt))
+        if stream:
+            return FakeStream(chunks, self.backend.chunk_delay)
+        time.sleep(self.backend.chunk_delay * (len(chunks) - 1))
+        return FakeResponse("".join(chunks))
+
+    async def generate_content_async(self, prompt: str, **kwargs) -> FakeResponse:
+        latency, error = self.backend.draw_call()
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        chunks = self.backend.chunks(self.backend.respond(prompt))
+        await asyncio.sleep(self.backend.chunk_delay * (len(chunks) - 1))
+        return FakeResponse("".join(chunks))
+
+
+class FakeBackend(LLMBackend):
+    """Offline backend with configurable latency and injected failures, for load tests and CI.
+
+    Response text is a pure function of the prompt and seed: resume parse
+    prompts get JSON with exactly the requested fields in the parser's
+    schema, anything else gets a short letter built from the prompt's
+    Position, Company and Skills lines. Each call first waits a latency
+    drawn from latency, then may fail. rate_limit_rate rejects calls at
+    once with ResourceExhausted (HTTP 429), as does going over
+    requests_per_minute; error_rate fails them after the latency with
+    ServiceUnavailable or InternalServerError. Responses arrive in chunks
+    of chunk_words words, chunk_delay seconds apart.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: Optional[LatencyDistribution] = None, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, requests_per_minute: Optional[int] = None, seed: int = 0,
+                 chunk_words: int = 12, chunk_delay: float = 0.02):
+        """Initialize backend; latency defaults to a lognormal around half a second."""
+        self.latency = latency or LatencyDistribution()
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.seed = seed
+        self.chunk_words = chunk_words
+        self.chunk_delay = chunk_delay
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.calls = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> 'FakeBackend':
+        """Backend configured by LLM_FAKE_LATENCY, LLM_FAKE_ERROR_RATE, LLM_FAKE_RATE_LIMIT_RATE,
+        LLM_FAKE_RPM and LLM_FAKE_SEED."""
+        rpm = os.getenv('LLM_FAKE_RPM')
+        return cls(
+            latency=LatencyDistribution.parse(os.getenv('LLM_FAKE_LATENCY', 'lognormal')),
+            error_rate=float(os.getenv('LLM_FAKE_ERROR_RATE', '0')),
+            rate_limit_rate=float(os.getenv('LLM_FAKE_RATE_LIMIT_RATE', '0')),
+            requests_per_minute=int(rpm) if rpm else None,
+            seed=int(os.getenv('LLM_FAKE_SEED', '0')),
+        )
+
+    def model(self, model_name: str) -> FakeModel:
+        logger.info(f"Using fake model {model_name} (latency {self.latency!r}, error rate {self.error_rate:g}, "
+                    f"rate limit rate {self.rate_limit_rate:g})")
+        return FakeModel(self, model_name)
+
+    def draw_call(self) -> Tuple[float, Optional[Exception]]:
+        """Latency and injected error (or None) for one call, counting it against the quota."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60.0:
+                self._window.popleft()
+            if self.requests_per_minute is not None and len(self._window) >= self.requests_per_minute:
+                self.rate_limited += 1
+                return 0.0, api_exceptions.ResourceExhausted(
+                    f"Quota exceeded: {self.requests_per_minute} requests per minute (fake backend)")
+            self._window.append(now)
+            if self._rng.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 0.0, api_exceptions.ResourceExhausted("Resource has been exhausted (fake backend)")
+            latency = self.latency.sample(self._rng)
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                error = self._rng.choice((api_exceptions.ServiceUnavailable, api_exceptions.InternalServerError))
+                return latency, error("Injected failure (fake backend)")
+            return latency, None
+
+    def respond(self, prompt: str) -> str:
+        """Deterministic response text for a prompt."""
+        rng = random.Random(stable_hash(f"{self.seed}\0{prompt}"))
+        if "Required JSON structure:" in prompt:
+            return json.dumps(fake_resume(prompt, rng))
+        return fake_letter(prompt, rng)
+
+    def chunks(self, text: str) -> List[str]:
+        """Split text into streaming chunks that join back to it exactly."""
+        words = re.findall(r"\s*\S+\s*", text) or [text]
+        return ["".join(words[start:start + self.chunk_words]) for start in range(0, len(words), self.chunk_words)]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'calls': self.calls, 'rate_limited': self.rate_limited, 'errors': self.errors}
+
+
+def _section(prompt: str, start: str, end: str) -> str:
+    """Prompt text between the start and end markers."""
+    _, _, rest = prompt.partition(start)
+    return rest.partition(end)[0]
+
+
+def _mentioned(skills: Sequence[str], text: str) -> List[str]:
+    """Skills whose every token appears in text."""
+    tokens = set(tokenize(text))
+    return [skill for skill in skills if all(token in tokens for token in tokenize(skill))]
+
+
+def fake_resume(prompt: str, rng: random.Random) -> Dict:
+    """Resume JSON with the fields a parse prompt asks for, reusing what its resume text contains."""
+    text = _section(prompt, "Resume text:", "Required JSON structure:")
+    fields = re.findall(r'^\s*"(\w+)":', _section(prompt, "Required JSON structure:", "Important:"), re.MULTILINE)
+    lines = [line.strip(" -•*\t") for line in text.splitlines()]
+    sentences = [line for line in lines if len(line) > 30]
+    skills = _mentioned(FAKE_SKILLS, text) or rng.sample(FAKE_SKILLS, 4)
+
+    values = {}
+    for field in fields:
+        if field == 'name':
+            values['name'] = next((line for line in lines if NAME_PATTERN.match(line)),
+                                  f"{rng.choice(FAKE_FIRST_NAMES)} {rng.choice(FAKE_LAST_NAMES)}")
+        elif field == 'contact':
+            email = EMAIL_PATTERN.search(text)
+            phone = PHONE_PATTERN.search(text)
+            values['contact'] = {
+                "email": email.group(0) if email else f"candidate{rng.randrange(10_000)}@example.com",
+                "phone": phone.group(0) if phone else f"+91 9{rng.randrange(10 ** 9):09d}",
+            }
+        elif field == 'skills':
+            values['skills'] = skills
+        elif field == 'experience':
+            start = rng.randrange(2012, 2022)
+            values['experience'] = [
+                {
+                    "company": rng.choice(FAKE_COMPANIES),
+                    "role": rng.choice(FAKE_ROLES),
+                    "duration": f"{start + 2 * entry} - {start + 2 * entry + 2}",
+                    "description": " ".join(rng.sample(sentences, min(2, len(sentences))))
+                                   or "Built and maintained backend services.",
+                }
+                for entry in range(rng.randint(1, 3))
+            ]
+        elif field == 'education':
+            values['education'] = [{"degree": rng.choice(FAKE_DEGREES), "institution": rng.choice(FAKE_INSTITUTIONS),
+                                    "year": str(rng.randrange(2010, 2025))}]
+        elif field == 'projects':
+            values['projects'] = [
+                {"name": name, "description": f"{name} built with {' and '.join(technologies)}.",
+                 "technologies": technologies}
+                for name, technologies in ((rng.choice(FAKE_PROJECTS), rng.sample(skills, min(2, len(skills))))
+                                           for _ in range(rng.randint(1, 2)))
+            ]
+        else:
+            values[field] = ""
+    return values
+
+
+def fake_letter(prompt: str, rng: random.Random) -> str:
+    """Short cover letter body built from the prompt's Position, Company and Skills lines."""
+    def value(label: str, default: str) -> str:
+        match = re.search(rf"^- {label}: (.+)$", prompt, re.MULTILINE)
+        return match.group(1).strip() if match else default
+
+    position = value('Position', 'this role')
+    company = value('Company', 'your company')
+    skills = ", ".join(value('Skills', 'software engineering').split(", ")[:3])
+    middle = " ".join(sentence.format(skills=skills, company=company)
+                      for sentence in rng.sample(FAKE_LETTER_SENTENCES, 3))
+    return (f"I am excited to apply for the {position} position at {company}.\n\n{middle}\n\n"
+            f"Thank you for considering my application. I would welcome the chance to discuss "
+            f"how I can contribute to {company}.")
@@ -0,0 +1,146 @@
+"""Offline load test of the parse -> match -> generate pipeline against the fake LLM backend.
+
+Run from src/:
+
+    python -m llm.loadtest --resumes 200 --users 16 --latency lognormal:0.8,0.4 --error-rate 0.02
+
+LLM_MAX_CONCURRENCY still caps in-flight model calls for the whole process.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import logging
+
+from job_search.job_search import JobSearch
+from rag_system.benchmark import SKILLS, TITLES, WORDS
+from rag_system.rag import RAGSystem
+from resume_parser.parser import ResumeParser
+from .client import LLMClient
+from .fake import FAKE_COMPANIES, FAKE_FIRST_NAMES, FAKE_LAST_NAMES, FakeBackend, LatencyDistribution
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_resume(number: int, rng: random.Random) -> str:
+    """Structured resume text; the rules resolve contact, skills and education, the LLM the rest."""
+    skills = rng.sample(SKILLS, 6)
+    experience = "\n".join(
+        f"- {rng.choice(TITLES)} at {rng.choice(FAKE_COMPANIES)}: {' '.join(rng.sample(WORDS, 8))} "
+        f"using {rng.choice(skills)}"
+        for _ in range(rng.randint(2, 5))
+    )
+    return f"""{rng.choice(FAKE_FIRST_NAMES)} {rng.choice(FAKE_LAST_NAMES)}
+candidate{number}@example.com | +91 98{number:08d}
+
+Skills
+{', '.join(skills)}
+
+Experience
+{experience}
+
+Education
+B.Tech in Computer Science, Indian Institute of Technology, {rng.randrange(2012, 2024)}
+
+Projects
+- {' '.join(rng.sample(WORDS, 3)).title()}: {' '.join(rng.sample(WORDS, 10))} with {rng.choice(skills)}
+"""
+
+
+def synthetic_jobs(count: int, rng: random.Random, first_id: int = 1_000_000) -> List[Dict]:
+    """Job postings drawn from the benchmark vocabularies."""
+    return [
+        {
+            "id": first_id + number,
+            "title": rng.choice(TITLES),
+            "company": rng.choice(FAKE_COMPANIES),
+            "location": rng.choice(["Bangalore", "Mumbai", "Remote", "Pune"]),
+            "description": " ".join(rng.sample(WORDS, 12)),
+            "requirements": rng.sample(SKILLS, 4),
+            "platform": "LinkedIn",
+        }
+        for number in range(count)
+    ]
+
+
+def run(args: argparse.Namespace) -> Dict:
+    """Run every stage once and return throughput, client and backend statistics."""
+    rng = random.Random(args.seed)
+    backend = FakeBackend(LatencyDistribution.parse(args.latency), error_rate=args.error_rate,
+                          rate_limit_rate=args.rate_limit_rate, requests_per_minute=args.rpm, seed=args.seed)
+    client = LLMClient(None, timeout=args.timeout, backoff_base=args.backoff_base, backend=backend)
+    report = {'backend': {'latency': repr(backend.latency), 'error_rate': args.error_rate,
+                          'rate_limit_rate': args.rate_limit_rate, 'rpm': args.rpm}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number in range(args.resumes):
+            path = os.path.join(directory, f"resume_{number:05d}.txt")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(synthetic_resume(number, rng))
+            paths.append(path)
+
+        parser = ResumeParser(None, llm=client)
+        started = time.perf_counter()
+        resumes, parse_errors = [], 0
+        for _, result in parser.parse_resumes(paths, max_concurrent_calls=args.users):
+            if isinstance(result, Exception):
+                parse_errors += 1
+            else:
+                resumes.append(result)
+        elapsed = time.perf_counter() - started
+        report['parse'] = {'resumes': len(resumes), 'errors': parse_errors, 'seconds': elapsed,
+                           'per_second': args.resumes / elapsed if elapsed else 0.0}
+
+    rag_system = RAGSystem(None, llm=client)
+    rag_system.add_jobs(JobSearch().jobs + synthetic_jobs(args.jobs, rng))
+    started = time.perf_counter()
+    matches = rag_system.find_similar_jobs_batch(resumes, k=args.matches)
+    elapsed = time.perf_counter() - started
+    report['match'] = {'resumes': len(resumes), 'seconds': elapsed,
+                       'per_second': len(resumes) / elapsed if elapsed else 0.0}
+
+    def draft(resume: Dict, ranked: List) -> int:
+        return sum(1 for _ in rag_system.generate_cover_letters_batch([job for job, _ in ranked], resume,
+                                                                      max_concurrency=args.matches))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.users) as pool:
+        letters = sum(pool.map(draft, resumes, matches))
+    elapsed = time.perf_counter() - started
+    report['generate'] = {'letters': letters, 'seconds': elapsed,
+                          'per_second': letters / elapsed if elapsed else 0.0}
+
+    report['llm'] = client.stats.as_dict()
+    report['fake'] = backend.stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test resume parsing, matching and cover letters offline")
+    parser.add_argument('--resumes', type=int, default=100)
+    parser.add_argument('--jobs', type=int, default=1_000, help="synthetic jobs added to the mock postings")
+    parser.add_argument('--matches', type=int, default=5, help="jobs matched, and letters drafted, per resume")
+    parser.add_argument('--users', type=int, default=8, help="resumes parsed and drafted concurrently")
+    parser.add_argument('--latency', default='lognormal:0.5,0.5',
+                        help="fake call latency, e.g. constant:0.2, uniform:0.1,1 or lognormal:0.8,0.4")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--rpm', type=int, help="fake requests-per-minute quota")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--backoff-base', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    # The pipeline logs every call at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
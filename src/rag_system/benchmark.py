@@ -0,0 +1,105 @@
+"""Recall and latency benchmark for the JobIndex tiers.
+
+Run from src/:
+
+    python -m rag_system.benchmark --sizes 10000 100000 1000000 --k 10
+"""
+import argparse
+import time
+import numpy as np
+from typing import Dict, List
+import logging
+
+from .embeddings import HashingEmbedder
+from .index import INDEX_TIERS, JobIndex, choose_index_tier, estimate_query_ms
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+TITLES = ["Python Developer", "Data Scientist", "DevOps Engineer", "ML Engineer", "Frontend Developer",
+          "Backend Engineer", "Full Stack Developer", "Data Engineer", "SRE", "Android Developer"]
+SKILLS = ["python", "java", "react", "node.js", "fastapi", "django", "pytorch", "tensorflow", "kubernetes",
+          "docker", "aws", "azure", "gcp", "sql", "spark", "kafka", "c++", "go", "rust", "typescript",
+          "airflow", "terraform", "graphql", "redis", "postgresql", "nlp", "computer", "vision", "pandas"]
+WORDS = ["build", "scalable", "services", "team", "product", "customers", "design", "deploy", "models",
+         "pipelines", "platform", "cloud", "analytics", "mobile", "web", "apis", "testing", "agile"]
+
+
+def synthetic_texts(count: int, seed: int) -> List[str]:
+    """Generate job-like texts drawn from fixed vocabularies."""
+    rng = np.random.default_rng(seed)
+    titles = rng.integers(0, len(TITLES), count)
+    skills = rng.integers(0, len(SKILLS), (count, 5))
+    words = rng.integers(0, len(WORDS), (count, 12))
+    return [
+        f"{TITLES[titles[i]]} {' '.join(SKILLS[j] for j in skills[i])} {' '.join(WORDS[j] for j in words[i])}"
+        for i in range(count)
+    ]
+
+
+def run_tier(tier: str, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> Dict:
+    """Build one tier and measure its recall@k and per-query latency."""
+    job_index = JobIndex(vectors.shape[1], tier=tier)
+    start = time.perf_counter()
+    job_index.rebuild(tier, np.arange(len(vectors), dtype=np.int64), vectors)
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    found = np.zeros((len(queries), k), dtype=np.int64)
+    for row in range(len(queries)):
+        start = time.perf_counter()
+        _, labels = job_index.search(queries[row:row + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[row] = labels[0]
+
+    hits = sum(len(np.intersect1d(found[row], truth[row])) for row in range(len(queries)))
+    return {
+        'tier': tier,
+        'build_s': build_seconds,
+        'recall': hits / truth.size,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def benchmark(sizes: List[int], tiers: List[str], k: int, num_queries: int, dimension: int) -> List[Dict]:
+    """Benchmark each tier on synthetic corpora of the given sizes."""
+    embedder = HashingEmbedder(dimension=dimension)
+    queries = embedder.embed_batch(synthetic_texts(num_queries, seed=1))
+    results = []
+    for size in sizes:
+        vectors = embedder.embed_batch(synthetic_texts(size, seed=0))
+        exact = JobIndex(dimension, tier='flat')
+        exact.rebuild('flat', np.arange(size, dtype=np.int64), vectors)
+        _, truth = exact.search(queries, k)
+
+        auto_tier = choose_index_tier(size, dimension)
+        print(f"\n{size} jobs (auto tier: {auto_tier}, "
+              f"modelled flat {estimate_query_ms('flat', size, dimension):.2f} ms, "
+              f"ivf {estimate_query_ms('ivf', size, dimension):.2f} ms)")
+        print(f"{'tier':<6} {'build s':>9} {'recall@' + str(k):>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for tier in tiers:
+            result = run_tier(tier, vectors, queries, truth, k)
+            result['size'] = size
+            results.append(result)
+            print(f"{tier:<6} {result['build_s']:>9.2f} {result['recall']:>10.3f} "
+                  f"{result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JobIndex tiers on synthetic job corpora")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--tiers', nargs='+', choices=INDEX_TIERS, default=list(INDEX_TIERS))
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dimension', type=int, default=256)
+    args = parser.parse_args()
+    # Modules imported above configured INFO logging first; keep their index build logs out of the table
+    logging.getLogger().setLevel(logging.WARNING)
+    benchmark(args.sizes, args.tiers, args.k, args.queries, args.dimension)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from utils.cache import LRUCache, SQLiteCache
+from utils.text import normalize_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-memory LRU tier and optional SQLite tier."""
+
+    def __init__(self, max_entries: int = 20_000, disk_path: Optional[str] = None,
+                 max_disk_entries: int = 500_000):
+        """Initialize cache tiers; the disk tier is only used when disk_path is given."""
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteCache(disk_path, max_disk_entries, table='embeddings') if disk_path else None
+
+    @staticmethod
+    def key(text: str, fingerprint: str) -> str:
+        """Cache key from the normalized text and the embedder version."""
+        return hashlib.sha256(f"{fingerprint}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def embed(self, texts: Sequence[str], embedder) -> np.ndarray:
+        """Embed texts, computing only the ones missing from every cache tier."""
+        fingerprint = embedder.fingerprint
+        keys = [self.key(text, fingerprint) for text in texts]
+        vectors = np.zeros((len(texts), embedder.dimension), dtype=np.float32)
+
+        missing: Dict[str, List[int]] = {}
+        for row, key in enumerate(keys):
+            cached = self.memory.get(key)
+            if cached is not None:
+                vectors[row] = cached
+            else:
+                missing.setdefault(key, []).append(row)
+
+        if missing and self.disk is not None:
+            for key, blob in self.disk.get_many(list(missing)).items():
+                vector = np.frombuffer(blob, dtype=np.float32)
+                vectors[missing.pop(key)] = vector
+                self.memory.put(key, vector)
+
+        if missing:
+            first_rows = [key_rows[0] for key_rows in missing.values()]
+            computed = embedder.embed_batch([texts[row] for row in first_rows])
+            for (key, key_rows), vector in zip(missing.items(), computed):
+                vectors[key_rows] = vector
+                # Copy so a cached row does not pin the whole batch matrix
+                self.memory.put(key, vector.copy())
+            if self.disk is not None:
+                self.disk.put_many((key, vector.tobytes()) for key, vector in zip(missing, computed))
+        return vectors
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss counters per tier for sizing the cache."""
+        stats = {'memory': self.memory.stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
+
+    def clear(self):
+        """Drop every cached embedding."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+# Fields that go into the cover letter prompt; anything else may change without a new letter
+COVER_LETTER_JOB_FIELDS = ('title', 'company', 'description', 'requirements')
+COVER_LETTER_RESUME_FIELDS = ('name', 'skills', 'experience', 'education', 'projects')
+
+
+class CoverLetterCache:
+    """In-memory LRU cache of generated cover letter bodies with a time-to-live."""
+
+    def __init__(self, max_entries: int = 1_000, ttl: Optional[float] = 24 * 3600):
+        """Initialize cache keeping at most max_entries letters for ttl seconds each."""
+        self.memory = LRUCache(max_entries, ttl=ttl)
+
+    @staticmethod
+    def key(job: Dict, resume_data: Dict, version: str) -> str:
+        """Stable hash of the job and resume fields used in the prompt, plus the model/prompt version."""
+        fields = [
+            version,
+            [job.get(field) for field in COVER_LETTER_JOB_FIELDS],
+            [resume_data.get(field) for field in COVER_LETTER_RESUME_FIELDS],
+        ]
+        payload = json.dumps(fields, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached letter body, or None."""
+        return self.memory.get(key)
+
+    def put(self, key: str, body: str):
+        """Store a generated letter body."""
+        self.memory.put(key, body)
+
+    def invalidate(self, key: str) -> bool:
+        """Drop one cached letter, returning whether it was cached."""
+        return self.memory.invalidate(key)
+
+    def clear(self):
+        """Drop every cached letter."""
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters."""
+        return self.memory.stats()
@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+import logging
+
+from utils.text import tokenize, stable_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class HashingEmbedder:
+    """Deterministic hashing-trick featurizer with sublinear TF weighting."""
+
+    VERSION = 1
+
+    def __init__(self, dimension: int = 256, batch_size: int = 4096, max_cached_tokens: int = 200_000):
+        """Initialize embedder with output dimension, rows projected per NumPy pass and token cache size."""
+        if dimension <= 0:
+            raise ValueError("Embedding dimension must be positive")
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.max_cached_tokens = max_cached_tokens
+        # token -> (bucket, sign); blake2b is stable across processes unlike hash()
+        self._token_cache: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Identify the vector space so vectors from different configs are never mixed."""
+        # The idf tag stays so indexes and caches saved by earlier versions remain valid
+        return f"hashing-v{self.VERSION}-d{self.dimension}-idf:none"
+
+    def _lookup(self, token: str) -> Tuple[int, float]:
+        """Map a token to its hashed bucket and sign."""
+        entry = self._token_cache.get(token)
+        if entry is None:
+            h = stable_hash(token)
+            entry = (h % self.dimension, 1.0 if (h >> 63) & 1 else -1.0)
+            # Rare tokens keep arriving with new postings; start over rather than grow forever
+            if len(self._token_cache) >= self.max_cached_tokens:
+                self._token_cache.clear()
+            self._token_cache[token] = entry
+        return entry
+
+    def _featurize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tokenize texts into flat (row, bucket, sign) arrays."""
+        rows: List[int] = []
+        cols: List[int] = []
+        signs: List[float] = []
+        lookup = self._lookup
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            for token in tokens:
+                bucket, sign = lookup(token)
+                cols.append(bucket)
+                signs.append(sign)
+            rows.extend([row] * len(tokens))
+        return (np.asarray(rows, dtype=np.int64),
+                np.asarray(cols, dtype=np.int64),
+                np.asarray(signs, dtype=np.float64))
+
+    def _project(self, texts: Sequence[str]) -> np.ndarray:
+        """Project one chunk of texts into L2-normalized vectors."""
+        n = len(texts)
+        rows, cols, signs = self._featurize(texts)
+        counts = np.bincount(rows * self.dimension + cols, weights=signs,
+                             minlength=n * self.dimension).reshape(n, self.dimension)
+        # Sublinear term frequency keeps repeated boilerplate from dominating
+        vectors = np.sign(counts) * np.log1p(np.abs(counts))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors.astype(np.float32)
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed many texts at once into a (len(texts), dimension) float32 matrix."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        chunks = [self._project(texts[start:start + self.batch_size])
+                  for start in range(0, len(texts), self.batch_size)]
+        return chunks[0] if len(chunks) == 1 else np.vstack(chunks)
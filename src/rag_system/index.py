@@ -0,0 +1,435 @@
+import faiss
+import numpy as np
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import logging
+import mmap
+import os
+
+from utils.text import stable_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def document_hash(document: Dict) -> int:
+    """Stable content hash of a job document."""
+    return stable_hash(json.dumps(document, sort_keys=True, default=str))
+
+
+def row_checksum(job_id: int, document: Dict) -> int:
+    """Checksum contribution of one indexed row."""
+    return stable_hash(f"{int(job_id)}:{document_hash(document)}")
+
+
+def corpus_checksum(jobs: Iterable[Dict]) -> int:
+    """Order-independent checksum of a job corpus, comparable to JobIndex.corpus_checksum."""
+    checksum = 0
+    for job in jobs:
+        checksum ^= row_checksum(job['id'], job)
+    return checksum
+
+
+class DiskDocuments(MutableMapping):
+    """Job id -> document map read lazily from a memory-mapped JSONL file.
+
+    Rows written after loading live in an in-memory overlay, so the file
+    itself is never modified and can be shared by several processes.
+    """
+
+    def __init__(self, docs_path: str, offsets_path: str):
+        self._file = open(docs_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        # (n, 3) int64 rows of job id, byte offset, byte length, sorted by id
+        self._offsets = np.load(offsets_path, mmap_mode='r')
+        self._overlay: Dict[int, Dict] = {}
+        self._deleted = set()
+
+    def _row(self, job_id) -> int:
+        ids = self._offsets[:, 0]
+        row = int(np.searchsorted(ids, job_id))
+        if row < len(ids) and ids[row] == job_id:
+            return row
+        return -1
+
+    def _on_disk(self, job_id) -> bool:
+        return job_id not in self._deleted and self._row(job_id) >= 0
+
+    def __getitem__(self, job_id) -> Dict:
+        if job_id in self._overlay:
+            return self._overlay[job_id]
+        row = self._row(job_id) if job_id not in self._deleted else -1
+        if row < 0:
+            raise KeyError(job_id)
+        _, offset, length = self._offsets[row]
+        return json.loads(self._data[offset:offset + length])
+
+    def __setitem__(self, job_id, document: Dict):
+        self._overlay[job_id] = document
+        if self._row(job_id) >= 0:
+            self._deleted.add(job_id)
+
+    def __delitem__(self, job_id):
+        if job_id in self._overlay:
+            del self._overlay[job_id]
+        elif self._on_disk(job_id):
+            self._deleted.add(job_id)
+        else:
+            raise KeyError(job_id)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._overlay or self._on_disk(job_id)
+
+    def __iter__(self) -> Iterator[int]:
+        for job_id in self._offsets[:, 0].tolist():
+            if job_id not in self._deleted:
+                yield job_id
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        disk = len(self._offsets) - len(self._deleted)
+        return disk + len(self._overlay)
+
+
+INDEX_TIERS = ('flat', 'ivf', 'hnsw')
+
+# Approximate cost of one float component in a FAISS distance scan
+SCAN_NS_PER_COMPONENT = 0.5
+
+
+def ivf_list_count(num_rows: int) -> int:
+    """Number of IVF lists for a corpus, keeping ~39 training points per centroid."""
+    return max(1, min(int(np.sqrt(num_rows)), num_rows // 39))
+
+
+def estimate_query_ms(tier: str, num_rows: int, dimension: int, nprobe: int = 48) -> float:
+    """Model single-query latency of a tier from the number of vectors it scans."""
+    if tier == 'flat':
+        scanned = num_rows
+    elif tier == 'ivf':
+        nlist = ivf_list_count(num_rows)
+        scanned = nlist + min(nprobe, nlist) * num_rows / nlist
+    else:
+        raise ValueError(f"No latency model for tier: {tier}")
+    return scanned * dimension * SCAN_NS_PER_COMPONENT / 1e6
+
+
+def choose_index_tier(num_rows: int, dimension: int, latency_target_ms: float = 10.0,
+                      nprobe: int = 48) -> str:
+    """Pick the cheapest tier whose modelled latency meets the target, else HNSW."""
+    for tier in ('flat', 'ivf'):
+        if estimate_query_ms(tier, num_rows, dimension, nprobe) <= latency_target_ms:
+            return tier
+    return 'hnsw'
+
+
+class JobIndex:
+    """FAISS vector index whose rows are addressed by job id.
+
+    The index tier (exact flat, IVF or HNSW) is picked from corpus size and a
+    latency target when tier is 'auto', and upgraded as the corpus grows.
+    HNSW cannot delete rows, so removals there are tombstoned and compacted
+    by a rebuild once they exceed max_tombstone_ratio of the index.
+    """
+
+    def __init__(self, dimension: int, tier: str = 'auto', latency_target_ms: float = 10.0,
+                 nprobe: int = 48, hnsw_m: int = 32, ef_search: int = 64,
+                 train_sample_size: int = 100_000, max_tombstone_ratio: float = 0.1):
+        """Initialize an empty index for vectors of the given dimension."""
+        if tier != 'auto' and tier not in INDEX_TIERS:
+            raise ValueError(f"Unknown index tier: {tier}")
+        self.dimension = dimension
+        self.tier_setting = tier
+        self.latency_target_ms = latency_target_ms
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.train_sample_size = train_sample_size
+        self.max_tombstone_ratio = max_tombstone_ratio
+        self.tier = 'flat'
+        self.index = self._new_index('flat', np.zeros((0, dimension), dtype=np.float32))
+        self.documents: MutableMapping = {}
+        self.read_only = False
+        self._tombstones = set()
+        self._trained_rows = 0
+        # Order-independent XOR of document hashes, maintained on every write
+        self.corpus_checksum = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self.documents
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("Index was loaded read-only and cannot be modified")
+
+    @staticmethod
+    def _as_ids(job_ids: Iterable) -> np.ndarray:
+        return np.fromiter((int(job_id) for job_id in job_ids), dtype=np.int64)
+
+    def _new_index(self, tier: str, vectors: np.ndarray):
+        """Create an empty FAISS index of the given tier, training it on a sample of vectors."""
+        if tier == 'flat':
+            return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+        if tier == 'hnsw':
+            hnsw = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m)
+            hnsw.hnsw.efSearch = self.ef_search
+            return faiss.IndexIDMap2(hnsw)
+        if tier == 'ivf':
+            if not len(vectors):
+                raise ValueError("IVF index needs vectors to train on")
+            nlist = ivf_list_count(len(vectors))
+            quantizer = faiss.IndexFlatL2(self.dimension)
+            ivf = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
+            sample_size = min(len(vectors), self.train_sample_size)
+            rng = np.random.default_rng(0)
+            sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+            ivf.train(np.ascontiguousarray(sample, dtype=np.float32))
+            # A hashtable direct map lets IVF reconstruct and remove rows by job id
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+            ivf.nprobe = self.nprobe
+            self._trained_rows = len(vectors)
+            return ivf
+        raise ValueError(f"Unknown index tier: {tier}")
+
+    def _apply_search_params(self):
+        """Apply query-time knobs, which are not always restored from disk."""
+        if self.tier == 'ivf':
+            faiss.extract_index_ivf(self.index).nprobe = self.nprobe
+        elif self.tier == 'hnsw':
+            faiss.downcast_index(self.index.index).hnsw.efSearch = self.ef_search
+
+    def _all_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (job_ids, vectors) of every live row."""
+        if isinstance(self.index, faiss.IndexIDMap2):
+            ids = faiss.vector_to_array(self.index.id_map).astype(np.int64)
+            vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+        else:
+            ivf = faiss.extract_index_ivf(self.index)
+            invlists = ivf.invlists
+            id_chunks = [np.zeros(0, dtype=np.int64)]
+            vector_chunks = [np.zeros((0, self.dimension), dtype=np.float32)]
+            for list_no in range(ivf.nlist):
+                size = invlists.list_size(list_no)
+                if not size:
+                    continue
+                id_chunks.append(faiss.rev_swig_ptr(invlists.get_ids(list_no), size).copy())
+                codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * ivf.code_size).copy()
+                vector_chunks.append(codes.view(np.float32).reshape(size, self.dimension))
+            ids = np.concatenate(id_chunks)
+            vectors = np.vstack(vector_chunks)
+        if self._tombstones:
+            live = ~np.isin(ids, np.fromiter(self._tombstones, dtype=np.int64))
+            ids, vectors = ids[live], vectors[live]
+        return ids, vectors
+
+    def rebuild(self, tier: Optional[str] = None, extra_ids: Optional[np.ndarray] = None,
+                extra_vectors: Optional[np.ndarray] = None):
+        """Rebuild the FAISS index from its live rows, optionally switching tier."""
+        self._check_writable()
+        ids, vectors = self._all_vectors()
+        if extra_ids is not None and len(extra_ids):
+            ids = np.concatenate([ids, extra_ids])
+            vectors = np.vstack([vectors, extra_vectors])
+        tier = tier or self.tier
+        self.index = self._new_index(tier, vectors)
+        self.tier = tier
+        self._tombstones.clear()
+        if len(ids):
+            self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+        logger.info(f"Rebuilt {tier} index with {len(ids)} rows")
+
+    def _target_tier(self, num_rows: int) -> str:
+        if self.tier_setting != 'auto':
+            return self.tier_setting
+        target = choose_index_tier(num_rows, self.dimension, self.latency_target_ms, self.nprobe)
+        # Only upgrade automatically, so shrinking corpora do not thrash rebuilds
+        return target if INDEX_TIERS.index(target) > INDEX_TIERS.index(self.tier) else self.tier
+
+    def add(self, job_ids: List[int], vectors: np.ndarray, documents: List[Dict]):
+        """Add new rows; ids must not already be indexed."""
+        ids = self._as_ids(job_ids)
+        if len(ids) != len(vectors) or len(ids) != len(documents):
+            raise ValueError("job_ids, vectors and documents must have the same length")
+        duplicates = [int(job_id) for job_id in ids if int(job_id) in self.documents]
+        if duplicates:
+            raise ValueError(f"Jobs already indexed: {duplicates[:10]}")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Duplicate job ids in batch")
+        if (ids < 0).any():
+            raise ValueError("Job ids must be non-negative; -1 is reserved for missing results")
+        if not len(ids):
+            return
+        self._check_writable()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        num_rows = len(self.documents) + len(ids)
+        target = self._target_tier(num_rows)
+        retrain = target == 'ivf' and num_rows > 4 * self._trained_rows
+        revived = self._tombstones and any(job_id in self._tombstones for job_id in ids.tolist())
+        if target != self.tier or retrain or revived:
+            self.rebuild(target, ids, vectors)
+        else:
+            self.index.add_with_ids(vectors, ids)
+        for job_id, document in zip(ids.tolist(), documents):
+            self.documents[job_id] = document
+            self.corpus_checksum ^= row_checksum(job_id, document)
+
+    def remove(self, job_ids: Iterable[int]) -> int:
+        """Remove rows by job id, ignoring ids that are not indexed."""
+        present = [job_id for job_id in self._as_ids(job_ids).tolist() if job_id in self.documents]
+        if not present:
+            return 0
+        self._check_writable()
+        if self.tier == 'hnsw':
+            self._tombstones.update(present)
+        else:
+            self.index.remove_ids(np.array(present, dtype=np.int64))
+        for job_id in present:
+            self.corpus_checksum ^= row_checksum(job_id, self.documents[job_id])
+            del self.documents[job_id]
+        if len(self._tombstones) > self.max_tombstone_ratio * max(self.index.ntotal, 1):
+            self.rebuild()
+        return len(present)
+
+    def reconstruct(self, job_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Fetch stored vectors for the indexed subset of job_ids."""
+        ids = np.array([job_id for job_id in self._as_ids(job_ids).tolist() if job_id in self.documents],
+                       dtype=np.int64)
+        vectors = np.zeros((len(ids), self.dimension), dtype=np.float32)
+        for row, job_id in enumerate(ids.tolist()):
+            vectors[row] = self.index.reconstruct(job_id)
+        return ids, vectors
+
+    def search(self, queries: np.ndarray, k: int,
+               candidate_ids: Optional[Iterable[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (distances, job_ids) of the k nearest rows per query, padded with -1 ids."""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if candidate_ids is None:
+            if not self._tombstones:
+                return self.index.search(queries, k)
+            # Over-fetch past tombstoned rows, then drop them
+            fetch = min(k + len(self._tombstones), max(self.index.ntotal, 1))
+            fetched_distances, fetched_labels = self.index.search(queries, fetch)
+            distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+            labels = np.full((len(queries), k), -1, dtype=np.int64)
+            dead = np.fromiter(self._tombstones, dtype=np.int64)
+            for row in range(len(queries)):
+                live = ~np.isin(fetched_labels[row], dead) & (fetched_labels[row] != -1)
+                kept = np.flatnonzero(live)[:k]
+                distances[row, :len(kept)] = fetched_distances[row, kept]
+                labels[row, :len(kept)] = fetched_labels[row, kept]
+            return distances, labels
+
+        # Score only the candidate rows from their stored vectors
+        ids, vectors = self.reconstruct(candidate_ids)
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+        if not len(ids):
+            return distances, labels
+        scores = (np.sum(queries ** 2, axis=1)[:, None]
+                  - 2.0 * queries @ vectors.T
+                  + np.sum(vectors ** 2, axis=1)[None, :])
+        top = min(k, len(ids))
+        nearest = np.argpartition(scores, top - 1, axis=1)[:, :top]
+        nearest_scores = np.take_along_axis(scores, nearest, axis=1)
+        order = np.argsort(nearest_scores, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        distances[:, :top] = np.take_along_axis(scores, nearest, axis=1)
+        labels[:, :top] = ids[nearest]
+        return distances, labels
+
+    @staticmethod
+    def _paths(path: str) -> Dict[str, str]:
+        return {
+            'index': f"{path}.faiss",
+            'docs': f"{path}.docs.jsonl",
+            'offsets': f"{path}.offsets.npy",
+            'meta': f"{path}.meta.json",
+        }
+
+    def save(self, path: str, fingerprint: str):
+        """Write the index, a JSONL document sidecar and its metadata to disk."""
+        if self._tombstones:
+            self.rebuild()
+        paths = self._paths(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = {name: f"{file_path}.tmp" for name, file_path in paths.items()}
+
+        faiss.write_index(self.index, tmp['index'])
+        job_ids = sorted(self.documents)
+        offsets = np.zeros((len(job_ids), 3), dtype=np.int64)
+        with open(tmp['docs'], 'wb') as docs_file:
+            position = 0
+            for row, job_id in enumerate(job_ids):
+                line = json.dumps(self.documents[job_id], default=str).encode('utf-8')
+                docs_file.write(line + b"\n")
+                offsets[row] = (job_id, position, len(line))
+                position += len(line) + 1
+        with open(tmp['offsets'], 'wb') as offsets_file:
+            np.save(offsets_file, offsets)
+
+        meta = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'fingerprint': fingerprint,
+            'dimension': self.dimension,
+            'tier': self.tier,
+            'trained_rows': self._trained_rows,
+            'count': len(job_ids),
+            'corpus_checksum': f"{self.corpus_checksum:016x}",
+            'sizes': {name: os.path.getsize(tmp[name]) for name in ('index', 'docs', 'offsets')},
+        }
+        with open(tmp['meta'], 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+        # Metadata is replaced last so a torn save is detected as stale
+        for name in ('index', 'docs', 'offsets', 'meta'):
+            os.replace(tmp[name], paths[name])
+        logger.info(f"Saved index with {len(job_ids)} jobs to {path}")
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str, mmap_index: bool = False,
+             **options) -> Optional['JobIndex']:
+        """Load a saved index, returning None if it is missing or stale.
+
+        With mmap_index the FAISS file is opened read-only and memory-mapped
+        where the index type supports it, so processes share it via the page cache.
+        """
+        paths = cls._paths(path)
+        if not all(os.path.exists(file_path) for file_path in paths.values()):
+            return None
+        with open(paths['meta']) as meta_file:
+            meta = json.load(meta_file)
+
+        if meta.get('format_version') != INDEX_FORMAT_VERSION:
+            logger.warning(f"Stale index at {path}: format version {meta.get('format_version')}")
+            return None
+        if meta.get('fingerprint') != fingerprint:
+            logger.warning(f"Stale index at {path}: built with {meta.get('fingerprint')}, expected {fingerprint}")
+            return None
+        for name, size in meta.get('sizes', {}).items():
+            if os.path.getsize(paths[name]) != size:
+                logger.warning(f"Stale index at {path}: {name} file size does not match metadata")
+                return None
+
+        job_index = cls(meta['dimension'], **options)
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap_index else 0
+        job_index.index = faiss.read_index(paths['index'], flags)
+        job_index.tier = meta.get('tier', 'flat')
+        job_index._trained_rows = meta.get('trained_rows', 0)
+        job_index._apply_search_params()
+        job_index.documents = DiskDocuments(paths['docs'], paths['offsets'])
+        job_index.read_only = mmap_index
+        job_index.corpus_checksum = int(meta['corpus_checksum'], 16)
+        if job_index.index.ntotal != meta['count'] or len(job_index.documents) != meta['count']:
+            logger.warning(f"Stale index at {path}: row count does not match metadata")
+            return None
+        logger.info(f"Loaded index with {meta['count']} jobs from {path}")
+        return job_index
@@ -0,0 +1,130 @@
+import heapq
+import math
+import os
+import pickle
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from utils.text import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled BM25Index layout changes
+LEXICAL_FORMAT_VERSION = 1
+
+# Title terms say more about a posting than description boilerplate
+FIELD_WEIGHTS = {'title': 2.0, 'description': 1.0, 'requirements': 1.5}
+
+
+def job_field_text(job: Dict, field: str) -> str:
+    """Return a job field as plain text, joining list fields such as requirements."""
+    value = job.get(field, '')
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return str(value or '')
+
+
+class BM25Index:
+    """Incremental BM25 inverted index over job title, description and requirements."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_df_ratio: float = 0.5,
+                 min_docs_for_pruning: int = 1000):
+        """Initialize empty index.
+
+        Once the index holds min_docs_for_pruning jobs, query terms found in
+        more than max_df_ratio of them are skipped: their IDF is near zero
+        and their posting lists would make query cost scale with the corpus.
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self.min_docs_for_pruning = min_docs_for_pruning
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_lengths: Dict[int, float] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self.doc_lengths
+
+    def add(self, jobs: Iterable[Dict]):
+        """Index jobs, replacing any previous version with the same id."""
+        for job in jobs:
+            job_id = job['id']
+            if job_id in self.doc_lengths:
+                self.remove([job_id])
+            weighted = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(job_field_text(job, field)):
+                    weighted[token] += weight
+            for token, tf in weighted.items():
+                self.postings.setdefault(token, {})[job_id] = tf
+            length = sum(weighted.values())
+            self._doc_terms[job_id] = tuple(weighted)
+            self.doc_lengths[job_id] = length
+            self._total_length += length
+
+    def remove(self, job_ids: Iterable[int]):
+        """Drop jobs from the index, ignoring unknown ids."""
+        for job_id in job_ids:
+            if job_id not in self.doc_lengths:
+                continue
+            for token in self._doc_terms.pop(job_id):
+                posting = self.postings[token]
+                del posting[job_id]
+                if not posting:
+                    del self.postings[token]
+            self._total_length -= self.doc_lengths.pop(job_id)
+
+    def search(self, query: str, limit: int = 100,
+               candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Return up to limit (job_id, score) pairs, scoring only jobs that contain a query term."""
+        num_docs = len(self.doc_lengths)
+        if not num_docs or limit <= 0:
+            return []
+        allowed = set(candidate_ids) if candidate_ids is not None else None
+        avg_length = self._total_length / num_docs
+        max_df = max(1, int(self.max_df_ratio * num_docs)) if num_docs >= self.min_docs_for_pruning else num_docs
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting or len(posting) > max_df:
+                continue
+            idf = math.log(1 + (num_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            if allowed is None:
+                matches = posting.items()
+            elif len(allowed) < len(posting):
+                matches = ((job_id, posting[job_id]) for job_id in allowed if job_id in posting)
+            else:
+                matches = ((job_id, tf) for job_id, tf in posting.items() if job_id in allowed)
+            for job_id, tf in matches:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[job_id] / avg_length)
+                scores[job_id] = scores.get(job_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def save(self, path: str, corpus_checksum: int):
+        """Pickle the postings to path, tagged with the checksum of the corpus they cover."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as file:
+            pickle.dump({'format_version': LEXICAL_FORMAT_VERSION, 'corpus_checksum': corpus_checksum,
+                         'index': self}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path: str, corpus_checksum: int) -> Optional['BM25Index']:
+        """Load postings saved for the same corpus, or None if they are missing or stale."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as file:
+            saved = pickle.load(file)
+        if saved.get('format_version') != LEXICAL_FORMAT_VERSION or saved.get('corpus_checksum') != corpus_checksum:
+            logger.warning(f"Stale BM25 index at {path}")
+            return None
+        return saved['index']
@@ -0,0 +1,130 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import numpy as np
+
+from llm.budget import PromptReport, select_within_budget, split_sentences, truncate_to_tokens
+from llm.client import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scores how relevant each candidate text is to the job text
+Scorer = Callable[[str, Sequence[str]], np.ndarray]
+
+# Shares of the budget for job text; the rest goes to the candidate's most relevant items
+DESCRIPTION_SHARE = 0.25
+REQUIREMENTS_SHARE = 0.15
+# Share of the budget kept for candidate items; the job text shrinks first to leave it free
+CANDIDATE_SHARE = 0.4
+
+GUIDELINES = """Guidelines:
+1. Be professional and engaging
+2. Highlight relevant skills and experience
+3. Show enthusiasm for the role
+4. Keep it concise (max 300 words)
+5. End with a professional closing
+
+Write the cover letter body only, without any headers or signatures."""
+
+
+def render_cover_letter_prompt(job: Dict, resume_data: Dict, description: str, requirements: List[str],
+                               skills: List[str], experience: List[str], projects: List[str]) -> str:
+    """Cover letter prompt from already selected parts."""
+    education = "\n".join(f"- {edu.get('degree', '')} from {edu.get('institution', '')}"
+                          for edu in resume_data.get('education', []))
+    sections = [
+        "Write a professional cover letter for the following job application:",
+        f"""Job Details:
+- Position: {job.get('title', 'Job Title')}
+- Company: {job.get('company', 'Company Name')}
+- Description: {description}
+- Requirements: {', '.join(requirements)}""",
+    ]
+    candidate = [
+        "Candidate Information:",
+        f"- Name: {resume_data.get('name', 'Your Name')}",
+        f"- Skills: {', '.join(skills)}",
+        "- Experience:",
+        *experience,
+        "- Education:",
+        education,
+    ]
+    if projects:
+        candidate += ["- Projects:", *projects]
+    sections.append("\n".join(line for line in candidate if line))
+    sections.append(GUIDELINES)
+    return "\n\n".join(sections)
+
+
+def experience_items(resume_data: Dict) -> List[str]:
+    """One prompt line per experience bullet, each naming its role and company."""
+    items = []
+    for exp in resume_data.get('experience', []):
+        role = f"{exp.get('role', '')} at {exp.get('company', '')}"
+        bullets = split_sentences(exp.get('description', '')) or ['']
+        items.extend(f"- {role}: {bullet}".rstrip(': ') for bullet in bullets)
+    return items
+
+
+def project_items(resume_data: Dict) -> List[str]:
+    items = []
+    for project in resume_data.get('projects', []):
+        technologies = ', '.join(project.get('technologies', []))
+        line = f"- {project.get('name', '')}: {project.get('description', '')}"
+        items.append(f"{line} ({technologies})" if technologies else line)
+    return items
+
+
+def build_cover_letter_prompt(job: Dict, resume_data: Dict, score: Scorer,
+                              token_budget: Optional[int]) -> Tuple[str, PromptReport]:
+    """Cover letter prompt fitted to token_budget, with a report of tokens saved.
+
+    The job description and requirements keep their leading parts within a
+    fixed share of the budget, shrunk further when the prompt's fixed text
+    would leave candidate items less than CANDIDATE_SHARE of it. The most
+    relevant skill and experience bullet are always kept; the remaining
+    skills, bullets and projects compete for the rest by relevance to the
+    job, and the winners are rendered in resume order. A token_budget of
+    None keeps everything.
+    """
+    description = str(job.get('description', 'Job Description'))
+    requirements = [str(req) for req in job.get('requirements', ['Job Requirements'])]
+    # Relevance is judged against the whole job, however much of it fits in the prompt
+    job_text = " ".join([str(job.get('title', '')), description, " ".join(requirements)])
+    skills = list(dict.fromkeys(str(skill) for skill in resume_data.get('skills', [])))
+    experience = list(dict.fromkeys(experience_items(resume_data)))
+    projects = list(dict.fromkeys(project_items(resume_data)))
+    full_prompt = render_cover_letter_prompt(job, resume_data, description, requirements, skills, experience, projects)
+    full_tokens = estimate_tokens(full_prompt)
+    if token_budget is None or full_tokens <= token_budget:
+        return full_prompt, PromptReport(full_tokens, full_tokens)
+
+    candidate_reserve = int(token_budget * CANDIDATE_SHARE)
+    fixed_tokens = estimate_tokens(render_cover_letter_prompt(job, resume_data, '', [], [], [], []))
+    job_shares = token_budget * (DESCRIPTION_SHARE + REQUIREMENTS_SHARE)
+    scale = min(1.0, max(0, token_budget - candidate_reserve - fixed_tokens) / job_shares)
+    description = truncate_to_tokens(description, int(token_budget * DESCRIPTION_SHARE * scale))
+    kept_requirements = select_within_budget(requirements, [-index for index in range(len(requirements))],
+                                             int(token_budget * REQUIREMENTS_SHARE * scale))
+    requirements = [requirements[index] for index in kept_requirements]
+    base_tokens = estimate_tokens(render_cover_letter_prompt(job, resume_data, description, requirements, [], [], []))
+
+    # Rank every candidate item together so the budget goes to whatever matches the job best
+    items = skills + experience + projects
+    scores = np.array(score(job_text, items) if items else np.zeros(0), dtype=np.float64)
+    pinned = [start + int(np.argmax(scores[start:end]))
+              for start, end in ((0, len(skills)), (len(skills), len(skills) + len(experience))) if end > start]
+    remaining = max(token_budget - base_tokens, candidate_reserve)
+    remaining -= sum(estimate_tokens(items[index]) + 1 for index in pinned)
+    scores[pinned] = -np.inf
+    chosen = set(pinned)
+    chosen.update(index for index in select_within_budget(items, scores, remaining) if index not in chosen)
+    selected = [[], [], []]
+    for index, item in enumerate(items):
+        if index in chosen:
+            group = 0 if index < len(skills) else 1 if index < len(skills) + len(experience) else 2
+            selected[group].append(item)
+
+    prompt = render_cover_letter_prompt(job, resume_data, description, requirements, *selected)
+    return prompt, PromptReport(estimate_tokens(prompt), full_tokens)
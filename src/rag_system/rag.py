@@ -1,104 +1,331 @@
-import faiss
+import asyncio
 import numpy as np
-import google.generativeai as genai
-from typing import List, Dict, Tuple
+from concurrent.futures import as_completed
+from typing import Iterator, List, Dict, Tuple, Optional
 import logging
 from datetime import datetime
+from itertools import islice
+from llm.client import LLMClient, get_client
+from utils.text import tokenize
+from .cache import CoverLetterCache, EmbeddingCache
+from .embeddings import HashingEmbedder
+from .index import JobIndex, corpus_checksum
+from .lexical import BM25Index
+from .prompting import build_cover_letter_prompt
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COVER_LETTER_MODEL = 'gemini-pro'
+# Bump whenever the cover letter prompt changes, so cached letters are regenerated
+COVER_LETTER_PROMPT_VERSION = 2
+
 class RAGSystem:
-    def __init__(self, api_key: str):
-        """Initialize RAG system with Gemini API."""
+    def __init__(self, api_key: str, embedding_dim: int = 256,
+                 index_path: Optional[str] = None, read_only: bool = False,
+                 index_tier: str = 'auto', latency_target_ms: float = 10.0,
+                 embedding_cache: Optional[EmbeddingCache] = None, hybrid: bool = True,
+                 lexical_candidates: int = 200, rrf_k: int = 60,
+                 lexical_weight: float = 1.0, vector_weight: float = 1.0,
+                 cover_letter_cache: Optional[CoverLetterCache] = None,
+                 prompt_token_budget: Optional[int] = 800, llm: Optional[LLMClient] = None):
+        """Initialize RAG system with Gemini API.
+
+        If index_path points to a saved index it is loaded instead of
+        re-embedding the corpus; read_only memory-maps it for sharing
+        between worker processes. index_tier is 'flat', 'ivf', 'hnsw' or
+        'auto' to choose from corpus size and latency_target_ms.
+        Embeddings go through embedding_cache, an in-memory one by default.
+        With hybrid, BM25 picks up to lexical_candidates jobs that share terms
+        with the resume and vector similarity reranks them, fused with
+        weighted reciprocal rank fusion (rrf_k, lexical_weight, vector_weight).
+        Generated cover letters are kept in cover_letter_cache, an in-memory
+        LRU with a one-day TTL by default. Cover letter prompts are kept
+        within prompt_token_budget estimated tokens; None sends the whole resume.
+        Model calls go through llm, the shared client for api_key by default.
+        """
         try:
-            genai.configure(api_key=api_key)
-            # Use the latest stable Gemini model
-            self.model = genai.GenerativeModel('gemini-pro')
-            logger.info("Using Gemini model: gemini-pro")
-            self.index = None
-            self.job_documents = []
+            # The model is created on first use, so startup makes no network calls
+            self.llm = llm or get_client(api_key)
+            self.embedder = HashingEmbedder(dimension=embedding_dim)
+            self.embedding_cache = embedding_cache or EmbeddingCache()
+            self.cover_letter_cache = cover_letter_cache or CoverLetterCache()
+            self.prompt_token_budget = prompt_token_budget
+            self.prompt_stats = {'calls': 0, 'prompt_tokens': 0, 'tokens_saved': 0}
+            self._index_options = {'tier': index_tier, 'latency_target_ms': latency_target_ms}
+            self.job_index = JobIndex(embedding_dim, **self._index_options)
+            self.index_path = index_path
+            self._dirty = False
+            self.hybrid = hybrid
+            self.lexical_candidates = lexical_candidates
+            self.rrf_k = rrf_k
+            self.lexical_weight = lexical_weight
+            self.vector_weight = vector_weight
+            # Built on first hybrid query so loading a saved index stays cheap
+            self.lexical: Optional[BM25Index] = None
+            if index_path:
+                self.load_index(index_path, read_only=read_only)
         except Exception as e:
             logger.error(f"Error initializing Gemini API: {str(e)}")
             raise
+
+    @property
+    def model(self):
+        """Gemini model used for cover letters."""
+        return self.llm.model(COVER_LETTER_MODEL)
         
-    def create_embeddings(self, text: str) -> np.ndarray:
-        """Create embeddings for text using Gemini API."""
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings for many texts, embedding cache misses in one vectorized pass."""
         try:
-            # Create a simple embedding by converting text to a fixed-size vector
-            # This is a placeholder until we implement proper embeddings
-            words = text.lower().split()
-            unique_words = list(set(words))
-            embedding = np.zeros(100)  # Fixed size of 100
-            for i, word in enumerate(unique_words[:100]):
-                embedding[i] = hash(word) % 100
-            return embedding.astype(np.float32)
+            return self.embedding_cache.embed(texts, self.embedder)
         except Exception as e:
             logger.error(f"Error creating embeddings: {str(e)}")
             raise
 
-    def build_index(self, jobs: List[Dict]):
-        """Build FAISS index from job descriptions."""
-        try:
-            if not jobs:
-                logger.warning("No jobs provided to build index")
-                return
+    def create_embeddings(self, text: str) -> np.ndarray:
+        """Create embedding for a single text."""
+        return self.embed_batch([text])[0]
+
+    @staticmethod
+    def _job_text(job: Dict) -> str:
+        """Combine the job fields used for matching."""
+        return f"{job['title']} {job['description']} {' '.join(job['requirements'])}"
+
+    @staticmethod
+    def _resume_text(resume_data: Dict) -> str:
+        """Combine the resume fields used for matching."""
+        skills = resume_data.get('skills', [])
+        if isinstance(skills, (list, tuple)):
+            skills = ' '.join(str(skill) for skill in skills)
+        experience = ' '.join(exp.get('description', '') for exp in resume_data.get('experience', []))
+        return f"{skills} {experience}"
 
-            # Create embeddings for each job
-            embeddings = []
+    def add_jobs(self, jobs: List[Dict]) -> int:
+        """Embed and index jobs whose ids are not indexed yet."""
+        try:
+            new_jobs = {}
             for job in jobs:
-                # Combine relevant job information
-                job_text = f"{job['title']} {job['description']} {' '.join(job['requirements'])}"
-                embedding = self.create_embeddings(job_text)
-                embeddings.append(embedding)
-                self.job_documents.append(job)
-
-            if not embeddings:
-                logger.warning("No embeddings created")
-                return
-
-            # Convert to numpy array
-            embeddings_array = np.array(embeddings, dtype=np.float32)
-            
-            # Create FAISS index
-            dimension = embeddings_array.shape[1]
-            self.index = faiss.IndexFlatL2(dimension)
-            self.index.add(embeddings_array)
-            
-            logger.info(f"Built FAISS index with {len(jobs)} jobs")
+                if job['id'] not in self.job_index and job['id'] not in new_jobs:
+                    new_jobs[job['id']] = job
+            if not new_jobs:
+                return 0
+
+            embeddings_array = self.embed_batch([self._job_text(job) for job in new_jobs.values()])
+            self.job_index.add(list(new_jobs.keys()), embeddings_array, list(new_jobs.values()))
+            if self.lexical is not None:
+                self.lexical.add(new_jobs.values())
+            self._dirty = True
+            logger.info(f"Added {len(new_jobs)} jobs to index ({len(self.job_index)} total)")
+            return len(new_jobs)
         except Exception as e:
-            logger.error(f"Error building index: {str(e)}")
+            logger.error(f"Error adding jobs to index: {str(e)}")
             raise
 
-    def find_similar_jobs(self, resume_data: Dict, k: int = 5) -> List[Dict]:
-        """Find similar jobs based on resume content."""
+    def remove_jobs(self, job_ids: List[int]) -> int:
+        """Remove jobs from the index by id."""
         try:
-            if not self.index:
-                logger.warning("Index not built. Returning all jobs.")
-                return self.job_documents[:k]
+            job_ids = list(job_ids)
+            removed = self.job_index.remove(job_ids)
+            if self.lexical is not None:
+                self.lexical.remove(job_ids)
+            self._dirty = self._dirty or removed > 0
+            logger.info(f"Removed {removed} jobs from index ({len(self.job_index)} total)")
+            return removed
+        except Exception as e:
+            logger.error(f"Error removing jobs from index: {str(e)}")
+            raise
 
-            # Create embedding for resume
-            resume_text = f"{resume_data['skills']} {' '.join([exp['description'] for exp in resume_data['experience']])}"
-            resume_embedding = self.create_embeddings(resume_text)
-            
-            # Search for similar jobs
-            distances, indices = self.index.search(
-                np.array([resume_embedding], dtype=np.float32), k
-            )
-            
-            # Get matching jobs
-            similar_jobs = [self.job_documents[idx] for idx in indices[0]]
-            return similar_jobs
+    def upsert_jobs(self, jobs: List[Dict]) -> int:
+        """Add new jobs and re-embed jobs whose content changed."""
+        try:
+            latest = {job['id']: job for job in jobs}
+            changed = [job_id for job_id, job in latest.items()
+                       if job_id in self.job_index and self.job_index.documents[job_id] != job]
+            self.job_index.remove(changed)
+            return self.add_jobs(list(latest.values()))
+        except Exception as e:
+            logger.error(f"Error upserting jobs: {str(e)}")
+            raise
+
+    def build_index(self, jobs: List[Dict]):
+        """Make sure the given jobs are indexed, touching only new or changed rows."""
+        if not jobs:
+            logger.warning("No jobs provided to build index")
+            return
+        self.upsert_jobs(jobs)
+
+    def save_index(self, path: Optional[str] = None, force: bool = False) -> bool:
+        """Persist the index and job metadata if they changed since the last save."""
+        path = path or self.index_path
+        if not path:
+            raise ValueError("No index path configured")
+        if not (self._dirty or force):
+            return False
+        try:
+            self.job_index.save(path, self.embedder.fingerprint)
+            # BM25 postings are saved alongside so a fresh process need not rebuild them
+            self._ensure_lexical().save(f"{path}.bm25.pkl", self.job_index.corpus_checksum)
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving index: {str(e)}")
+            raise
+
+    def load_index(self, path: Optional[str] = None, read_only: bool = False,
+                   jobs: Optional[List[Dict]] = None) -> bool:
+        """Load a saved index, rebuilding it when it is missing or stale.
+
+        When jobs are given and the saved corpus checksum differs from
+        theirs, the index is reconciled so that it holds exactly those jobs.
+        """
+        path = path or self.index_path
+        try:
+            loaded = JobIndex.load(path, self.embedder.fingerprint, mmap_index=read_only,
+                                   **self._index_options)
+        except Exception as e:
+            logger.error(f"Error loading index from {path}: {str(e)}")
+            loaded = None
+
+        self.lexical = None
+        if loaded is not None:
+            self.job_index = loaded
+            self._dirty = False
+            try:
+                self.lexical = BM25Index.load(f"{path}.bm25.pkl", loaded.corpus_checksum)
+            except Exception as e:
+                logger.warning(f"Could not load BM25 index for {path}: {str(e)}")
+        else:
+            self.job_index = JobIndex(self.embedder.dimension, **self._index_options)
+
+        if jobs is not None and corpus_checksum(jobs) != self.job_index.corpus_checksum:
+            if self.job_index.read_only:
+                logger.warning("Saved index does not match current jobs but was loaded read-only")
+            else:
+                logger.info("Saved index does not match current jobs, rebuilding changed rows")
+                current_ids = {job['id'] for job in jobs}
+                self.remove_jobs([job_id for job_id in self.job_index.documents if job_id not in current_ids])
+                self.upsert_jobs(jobs)
+        return loaded is not None
+
+    def _first_jobs(self, k: int, candidate_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Return up to k indexed jobs without ranking."""
+        documents = self.job_index.documents
+        if candidate_ids is None:
+            return list(islice(documents.values(), k))
+        return list(islice((documents[job_id] for job_id in candidate_ids if job_id in documents), k))
+
+    def _ensure_lexical(self) -> BM25Index:
+        """Build the BM25 index from the indexed jobs on first use, unless it was loaded with the index."""
+        if self.lexical is None:
+            lexical = BM25Index()
+            lexical.add(self.job_index.documents.values())
+            self.lexical = lexical
+            logger.info(f"Built BM25 index with {len(lexical)} jobs")
+        return self.lexical
+
+    def _hybrid_rank(self, resumes: List[Dict], resume_embeddings: np.ndarray, k: int,
+                     candidate_ids: Optional[List[int]] = None) -> List[List[Tuple[Dict, float]]]:
+        """Prune with BM25, rerank the survivors by vector distance and fuse both rankings.
+
+        BM25 runs per resume, but the survivors of every resume are
+        reconstructed once and scored with a single matrix product.
+        """
+        lexical = self._ensure_lexical()
+        lexical_ids = [[job_id for job_id, _ in lexical.search(self._resume_text(resume), self.lexical_candidates,
+                                                                 candidate_ids)]
+                       for resume in resumes]
+        union_ids, vectors = self.job_index.reconstruct(list(dict.fromkeys(
+            job_id for resume_ids in lexical_ids for job_id in resume_ids)))
+        column = {job_id: position for position, job_id in enumerate(union_ids.tolist())}
+        # Squared L2 distances, the same metric as the index search
+        distances = (np.sum(resume_embeddings ** 2, axis=1)[:, None]
+                     - 2.0 * resume_embeddings @ vectors.T
+                     + np.sum(vectors ** 2, axis=1)[None, :])
+
+        rankings: List[List[int]] = []
+        vector_distances: List[Dict[int, float]] = []
+        for row, resume_ids in enumerate(lexical_ids):
+            resume_ids = [job_id for job_id in resume_ids if job_id in column]
+            vector_distance = {job_id: float(distances[row, column[job_id]]) for job_id in resume_ids}
+            fused: Dict[int, float] = {}
+            for rank, job_id in enumerate(resume_ids):
+                fused[job_id] = self.lexical_weight / (self.rrf_k + rank + 1)
+            for rank, job_id in enumerate(sorted(resume_ids, key=vector_distance.get)):
+                fused[job_id] += self.vector_weight / (self.rrf_k + rank + 1)
+            rankings.append(sorted(fused, key=lambda job_id: (-fused[job_id], vector_distance[job_id]))[:k])
+            vector_distances.append(vector_distance)
+
+        # Too few jobs share a term with some resumes; backfill them by vector similarity in one search
+        short = [row for row, ranked in enumerate(rankings) if len(ranked) < k]
+        if short:
+            backfill_distances, backfill_ids = self.job_index.search(resume_embeddings[short], 2 * k, candidate_ids)
+            for row, row_ids, row_distances in zip(short, backfill_ids.tolist(), backfill_distances.tolist()):
+                ranked, seen = rankings[row], set(rankings[row])
+                for job_id, distance in zip(row_ids, row_distances):
+                    if job_id != -1 and job_id not in seen and len(ranked) < k:
+                        ranked.append(job_id)
+                        vector_distances[row][job_id] = float(distance)
+
+        documents = self.job_index.documents
+        return [[(documents[job_id], vector_distance.get(job_id, float('inf'))) for job_id in ranked]
+                for ranked, vector_distance in zip(rankings, vector_distances)]
+
+    def _rank(self, resumes: List[Dict], k: int,
+              candidate_ids: Optional[List[int]] = None) -> List[List[Tuple[Dict, float]]]:
+        """Embed resumes in one batch and rank jobs for all of them with batched index lookups."""
+        if not resumes or not len(self.job_index) or k <= 0:
+            return [[] for _ in resumes]
+
+        resume_embeddings = self.embed_batch([self._resume_text(resume) for resume in resumes])
+        if self.hybrid:
+            return self._hybrid_rank(resumes, resume_embeddings, k, candidate_ids)
+
+        distances, job_ids = self.job_index.search(resume_embeddings, min(k, len(self.job_index)), candidate_ids)
+
+        documents = self.job_index.documents
+        # Padding ids (-1) appear when fewer than k jobs are reachable
+        return [
+            [(documents[job_id], float(distance))
+             for job_id, distance in zip(row_ids.tolist(), row_distances.tolist()) if job_id != -1]
+            for row_ids, row_distances in zip(job_ids, distances)
+        ]
+
+    def find_similar_jobs(self, resume_data: Dict, k: int = 5,
+                          candidate_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Find similar jobs based on resume content, optionally within a candidate id subset."""
+        try:
+            if not len(self.job_index):
+                logger.warning("Index not built. No jobs to match.")
+                return []
+            return [job for job, _ in self._rank([resume_data], k, candidate_ids)[0]]
         except Exception as e:
             logger.error(f"Error finding similar jobs: {str(e)}")
-            return self.job_documents[:k]  # Return first k jobs as fallback
+            return self._first_jobs(k, candidate_ids)  # Return first k jobs as fallback
 
-    def generate_cover_letter(self, job: Dict, resume_data: Dict) -> str:
-        """Generate personalized cover letter using Gemini API."""
+    def find_similar_jobs_batch(self, resumes: List[Dict], k: int = 5,
+                                candidate_ids: Optional[List[int]] = None) -> List[List[Tuple[Dict, float]]]:
+        """Match many resumes at once, returning a ranked (job, distance) list per resume."""
         try:
-            # Create header with candidate's information
-            header = f"""
+            if not len(self.job_index):
+                logger.warning("Index not built. No jobs to match.")
+            matches = self._rank(resumes, k, candidate_ids)
+            logger.info(f"Matched {len(resumes)} resumes against {len(self.job_index)} jobs")
+            return matches
+        except Exception as e:
+            logger.error(f"Error finding similar jobs in batch: {str(e)}")
+            raise
+
+    @property
+    def cover_letter_version(self) -> str:
+        """Backend, model and prompt version that cached cover letters must match."""
+        return (f"{self.llm.backend.name}:{COVER_LETTER_MODEL}:prompt-v{COVER_LETTER_PROMPT_VERSION}"
+                f":budget-{self.prompt_token_budget}")
+
+    @staticmethod
+    def _cover_letter_header(job: Dict, resume_data: Dict) -> str:
+        """Letter header with the candidate's details, today's date and the employer."""
+        return f"""
             {resume_data.get('name', 'Your Name')}
             {resume_data.get('contact', {}).get('email', 'your.email@example.com')}
             {resume_data.get('contact', {}).get('phone', '')}
@@ -112,67 +339,180 @@ class RAGSystem:
             Dear Hiring Manager,
             """
 
-            # Prepare resume information
-            skills = resume_data.get('skills', [])
-            experience = resume_data.get('experience', [])
-            education = resume_data.get('education', [])
-            
-            # Format experience and education
-            exp_text = "\n".join([f"- {exp.get('role', '')} at {exp.get('company', '')}: {exp.get('description', '')}" 
-                                for exp in experience])
-            edu_text = "\n".join([f"- {edu.get('degree', '')} from {edu.get('institution', '')}" 
-                                for edu in education])
-
-            prompt = f"""Write a professional cover letter for the following job application:
-
-Job Details:
-- Position: {job.get('title', 'Job Title')}
-- Company: {job.get('company', 'Company Name')}
-- Description: {job.get('description', 'Job Description')}
-- Requirements: {', '.join(job.get('requirements', ['Job Requirements']))}
-
-Candidate Information:
-- Name: {resume_data.get('name', 'Your Name')}
-- Skills: {', '.join(skills)}
-- Experience:
-{exp_text}
-- Education:
-{edu_text}
-
-Guidelines:
-1. Be professional and engaging
-2. Highlight relevant skills and experience
-3. Show enthusiasm for the role
-4. Keep it concise (max 300 words)
-5. End with a professional closing
-
-Write the cover letter body only, without any headers or signatures."""
+    @staticmethod
+    def _experience_text(resume_data: Dict) -> str:
+        return "\n".join([f"- {exp.get('role', '')} at {exp.get('company', '')}: {exp.get('description', '')}"
+                          for exp in resume_data.get('experience', [])])
 
-            try:
-                response = self.model.generate_content(prompt)
-                if response and response.text:
-                    # Combine header with generated content
-                    cover_letter = header + "\n\n" + response.text + "\n\nSincerely,\n" + resume_data.get('name', 'Your Name')
-                    return cover_letter
-                else:
-                    raise Exception("Empty response from Gemini API")
-            except Exception as api_error:
-                logger.error(f"Error from Gemini API: {str(api_error)}")
-                # Return a basic cover letter if API fails
-                return f"""{header}
+    def _relevance_scores(self, job_text: str, items: List[str]) -> np.ndarray:
+        """Relevance of each item to the job: embedding cosine similarity plus the share of item terms in the job."""
+        vectors = self.embed_batch([job_text] + list(items))
+        similarity = vectors[1:] @ vectors[0]
+        job_terms = set(tokenize(job_text))
+        overlap = np.array([len(job_terms.intersection(terms)) / len(terms) if terms else 0.0
+                            for terms in (set(tokenize(item)) for item in items)], dtype=np.float32)
+        return similarity + overlap
 
-I am writing to express my interest in the {job.get('title', 'position')} at {job.get('company', 'your company')}. With my background in {', '.join(skills[:3])}, I believe I would be a valuable addition to your team.
+    def _cover_letter_prompt(self, job: Dict, resume_data: Dict) -> str:
+        """Prompt for the letter body; uses only COVER_LETTER_JOB_FIELDS and COVER_LETTER_RESUME_FIELDS.
 
-{exp_text[:200]}...
+        With a prompt_token_budget, only the resume items most relevant to
+        the job are included; tokens saved are logged and added to prompt_stats.
+        """
+        prompt, report = build_cover_letter_prompt(job, resume_data, self._relevance_scores,
+                                                   self.prompt_token_budget)
+        self.prompt_stats['calls'] += 1
+        self.prompt_stats['prompt_tokens'] += report.prompt_tokens
+        self.prompt_stats['tokens_saved'] += report.tokens_saved
+        logger.info(f"Cover letter prompt for job {job.get('id')}: ~{report.prompt_tokens} tokens "
+                    f"({report.tokens_saved} saved of {report.full_tokens})")
+        return prompt
 
-I am excited about the opportunity to contribute to {job.get('company', 'your company')} and would welcome the chance to discuss how my skills and experience align with your needs.
+    @staticmethod
+    def _cover_letter_closing(resume_data: Dict) -> str:
+        return "\n\nSincerely,\n" + resume_data.get('name', 'Your Name')
 
-Sincerely,
-{resume_data.get('name', 'Your Name')}"""
+    def _fallback_body(self, job: Dict, resume_data: Dict) -> str:
+        """Body of the basic template letter used when the model call fails."""
+        skills = resume_data.get('skills', [])
+        return f"""I am writing to express my interest in the {job.get('title', 'position')} at {job.get('company', 'your company')}. With my background in {', '.join(skills[:3])}, I believe I would be a valuable addition to your team.
+
+{self._experience_text(resume_data)[:200]}...
+
+I am excited about the opportunity to contribute to {job.get('company', 'your company')} and would welcome the chance to discuss how my skills and experience align with your needs."""
+
+    def _fallback_cover_letter(self, header: str, job: Dict, resume_data: Dict) -> str:
+        """Basic template letter used when the model call fails."""
+        return header + "\n\n" + self._fallback_body(job, resume_data) + self._cover_letter_closing(resume_data)
+
+    @staticmethod
+    def _cover_letter_error(job: Dict, error: Exception) -> str:
+        return f"""Error generating cover letter. Please try again.
+
+Job: {job.get('title', 'Job Title')} at {job.get('company', 'Company Name')}
+Error: {str(error)}"""
+
+    def generate_cover_letter(self, job: Dict, resume_data: Dict, regenerate: bool = False) -> str:
+        """Generate personalized cover letter using Gemini API.
+
+        Letter bodies are cached per job and resume content, so reopening a
+        posting does not call the model again; regenerate bypasses the cache
+        and replaces the cached letter. Header and date are rebuilt each time.
+        """
+        try:
+            # Create header with candidate's information
+            header = self._cover_letter_header(job, resume_data)
+            cache_key = self.cover_letter_cache.key(job, resume_data, self.cover_letter_version)
+            body = None if regenerate else self.cover_letter_cache.get(cache_key)
+
+            if body is None:
+                prompt = self._cover_letter_prompt(job, resume_data)
+                try:
+                    response = self.llm.generate(prompt, COVER_LETTER_MODEL)
+                    if response and response.text:
+                        body = response.text
+                        self.cover_letter_cache.put(cache_key, body)
+                    else:
+                        raise Exception("Empty response from Gemini API")
+                except Exception as api_error:
+                    logger.error(f"Error from Gemini API: {str(api_error)}")
+                    # Return a basic cover letter if API fails
+                    return self._fallback_cover_letter(header, job, resume_data)
+            else:
+                logger.info("Using cached cover letter")
+
+            # Combine header with generated content
+            return header + "\n\n" + body + self._cover_letter_closing(resume_data)
 
         except Exception as e:
             logger.error(f"Error generating cover letter: {str(e)}")
-            return f"""Error generating cover letter. Please try again.
+            return self._cover_letter_error(job, e) 
 
-Job: {job.get('title', 'Job Title')} at {job.get('company', 'Company Name')}
-Error: {str(e)}""" 
\ No newline at end of file
+    def generate_cover_letter_stream(self, job: Dict, resume_data: Dict,
+                                     regenerate: bool = False) -> Iterator[str]:
+        """Stream a cover letter: the header at once, then the body as the model writes it.
+
+        Joined, the chunks equal what generate_cover_letter returns. If the
+        model fails before writing anything the template body is streamed
+        instead; if it fails midway the partial letter is closed off and
+        not cached.
+        """
+        try:
+            header = self._cover_letter_header(job, resume_data)
+            cache_key = self.cover_letter_cache.key(job, resume_data, self.cover_letter_version)
+        except Exception as e:
+            logger.error(f"Error generating cover letter: {str(e)}")
+            yield self._cover_letter_error(job, e)
+            return
+
+        yield header + "\n\n"
+        body = None if regenerate else self.cover_letter_cache.get(cache_key)
+        if body is not None:
+            logger.info("Using cached cover letter")
+            yield body
+            yield self._cover_letter_closing(resume_data)
+            return
+
+        chunks: List[str] = []
+        try:
+            for chunk in self.llm.stream(self._cover_letter_prompt(job, resume_data), COVER_LETTER_MODEL):
+                chunks.append(chunk)
+                yield chunk
+            if not chunks:
+                raise Exception("Empty response from Gemini API")
+            self.cover_letter_cache.put(cache_key, "".join(chunks))
+        except Exception as api_error:
+            logger.error(f"Error from Gemini API: {str(api_error)}")
+            if not chunks:
+                yield self._fallback_body(job, resume_data)
+        yield self._cover_letter_closing(resume_data)
+
+    async def _generate_cover_letter_async(self, job: Dict, resume_data: Dict,
+                                           semaphore: asyncio.Semaphore, regenerate: bool = False) -> str:
+        """Async generate_cover_letter; falls back to the template on any model error."""
+        try:
+            header = self._cover_letter_header(job, resume_data)
+            cache_key = self.cover_letter_cache.key(job, resume_data, self.cover_letter_version)
+            body = None if regenerate else self.cover_letter_cache.get(cache_key)
+
+            if body is None:
+                prompt = self._cover_letter_prompt(job, resume_data)
+                try:
+                    async with semaphore:
+                        response = await self.llm.generate_async(prompt, COVER_LETTER_MODEL)
+                    if response and response.text:
+                        body = response.text
+                        self.cover_letter_cache.put(cache_key, body)
+                    else:
+                        raise Exception("Empty response from Gemini API")
+                except Exception as api_error:
+                    logger.error(f"Error from Gemini API for job {job.get('id')}: {str(api_error)}")
+                    return self._fallback_cover_letter(header, job, resume_data)
+
+            return header + "\n\n" + body + self._cover_letter_closing(resume_data)
+
+        except Exception as e:
+            logger.error(f"Error generating cover letter: {str(e)}")
+            return self._cover_letter_error(job, e)
+
+    def generate_cover_letters_batch(self, jobs: List[Dict], resume_data: Dict, max_concurrency: int = 5,
+                                     regenerate: bool = False) -> Iterator[Tuple[Dict, str]]:
+        """Generate cover letters for many jobs concurrently, yielding (job, letter) as each completes.
+
+        Calls go through the async Gemini API with at most max_concurrency in
+        flight, so a batch takes roughly as long as its slowest call. A job
+        whose call fails gets the template letter without affecting the rest;
+        cached letters come back without a call.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        futures = {
+            self.llm.submit(self._generate_cover_letter_async(job, resume_data, semaphore, regenerate)): job
+            for job in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Stop outstanding calls if the caller stops early
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,46 @@
+import hashlib
+import json
+from typing import Dict, Optional
+import logging
+
+from utils.cache import SQLiteCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ParseCache:
+    """Persistent cache of parsed resumes keyed by file content and parser version."""
+
+    def __init__(self, path: str, max_entries: int = 5_000):
+        """Open the cache at path, keeping at most max_entries parses."""
+        self.store = SQLiteCache(path, max_entries, table='resume_parses')
+
+    @staticmethod
+    def key(content: bytes, version: str) -> str:
+        """SHA-256 of the file bytes, salted with the prompt/model version."""
+        digest = hashlib.sha256(version.encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a fresh copy of the cached parse, or None."""
+        blob = self.store.get(key)
+        return None if blob is None else json.loads(blob)
+
+    def put(self, key: str, parsed_data: Dict):
+        """Store a parse result."""
+        self.store.put(key, json.dumps(parsed_data).encode('utf-8'))
+
+    def invalidate(self, key: str) -> bool:
+        """Drop one cached parse, returning whether it was cached."""
+        return self.store.invalidate(key)
+
+    def clear(self):
+        """Drop every cached parse."""
+        self.store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters."""
+        return self.store.stats()
@@ -1,76 +1,202 @@
+import argparse
 import os
+import sys
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 import PyPDF2
 import docx
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
 import json
+from llm.budget import PromptReport, fit_texts
+from llm.client import LLMClient, estimate_tokens, get_client
+from .cache import ParseCache
+from .rules import RESUME_FIELDS, parse_with_rules
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'models/gemini-1.5-pro'
+# Bump whenever the prompt or the post-processing of the response changes
+PROMPT_VERSION = 3
+
+# JSON structure of each resume field, as shown to the model
+FIELD_SCHEMAS = {
+    'name': '"Full Name"',
+    'contact': '{"email": "Email address", "phone": "Phone number"}',
+    'skills': '["Skill 1", "Skill 2", ...]',
+    'experience': '[{"company": "Company name", "role": "Job title", "duration": "Time period", '
+                  '"description": "Key responsibilities and achievements"}]',
+    'education': '[{"degree": "Degree name", "institution": "School/University name", "year": "Graduation year"}]',
+    'projects': '[{"name": "Project name", "description": "Project description", '
+                '"technologies": ["Tech 1", "Tech 2", ...]}]',
+}
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Prompt budget for resume text; longer CVs and portfolios are cut off here
+MAX_RESUME_PAGES = 10
+MAX_RESUME_CHARS = 30_000
+# Estimated tokens of resume text per Gemini call, shared between the sections sent
+PROMPT_TOKEN_BUDGET = 4_000
+
+
+def iter_pdf_pages(file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each PDF page in order, parsing pages only as they are consumed."""
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in islice(reader.pages, max_pages):
+            yield page.extract_text() or ""
+
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """Yield the text of each DOCX paragraph in order."""
+    doc = docx.Document(file_path)
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+
+
+def join_capped(parts: Iterable[str], max_chars: Optional[int] = None, separator: str = "\n") -> str:
+    """Join text parts once, no longer consuming parts after max_chars characters."""
+    collected: List[str] = []
+    size = 0
+    for part in parts:
+        if max_chars is not None and size + len(part) >= max_chars:
+            collected.append(part[:max(0, max_chars - size)])
+            break
+        collected.append(part)
+        size += len(part) + len(separator)
+    return separator.join(collected)
+
+
+def extract_text_from_pdf(file_path: str, max_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None) -> str:
+    """Extract text from PDF file, reading at most max_pages pages and max_chars characters."""
+    return join_capped(iter_pdf_pages(file_path, max_pages), max_chars)
+
+
+def extract_text_from_docx(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Extract text from DOCX file, reading at most max_chars characters."""
+    return join_capped(iter_docx_paragraphs(file_path), max_chars)
+
+
+def extract_resume_text(file_path: str, max_pages: Optional[int] = None,
+                        max_chars: Optional[int] = None) -> str:
+    """Extract text from a PDF, DOCX or plain-text resume within the page and character caps.
+
+    Module-level so it can run in worker processes.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == '.pdf':
+        return extract_text_from_pdf(file_path, max_pages, max_chars)
+    elif file_extension == '.docx':
+        return extract_text_from_docx(file_path, max_chars)
+    with open(file_path, 'r') as file:
+        return file.read(-1 if max_chars is None else max_chars)
+
+
 class ResumeParser:
-    def __init__(self, api_key: str):
-        """Initialize the resume parser with Gemini API key."""
+    def __init__(self, api_key: str, cache: Optional[ParseCache] = None,
+                 max_pages: Optional[int] = MAX_RESUME_PAGES, max_chars: Optional[int] = MAX_RESUME_CHARS,
+                 prompt_token_budget: Optional[int] = PROMPT_TOKEN_BUDGET, llm: Optional[LLMClient] = None):
+        """Initialize the resume parser with Gemini API key and an optional parse cache.
+
+        Extraction stops after max_pages PDF pages or max_chars characters,
+        whichever comes first, so the prompt stays within budget. The text
+        sent to Gemini is further cut to prompt_token_budget estimated tokens.
+        Calls go through llm, the shared client for api_key by default.
+        """
         try:
-            if not api_key:
+            self.cache = cache
+            self.max_pages = max_pages
+            self.max_chars = max_chars
+            self.prompt_token_budget = prompt_token_budget
+            self.prompt_stats = {'calls': 0, 'prompt_tokens': 0, 'tokens_saved': 0}
+            # The model is created on first use, so startup makes no network calls
+            self.llm = llm or get_client(api_key)
+            if not api_key and self.llm.backend.requires_api_key:
                 raise ValueError("Gemini API key is required")
-            
-            genai.configure(api_key=api_key)
-            # List available models
-            models = [m for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
-            logger.info(f"Available models: {[m.name for m in models]}")
-            
-            # Use the correct Gemini model
-            self.model = genai.GenerativeModel('models/gemini-1.5-pro')
-            logger.info("Using Gemini model: models/gemini-1.5-pro")
         except Exception as e:
             logger.error(f"Error initializing Gemini API: {str(e)}")
             raise
 
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    @property
+    def model(self):
+        """Gemini model used for parsing."""
+        return self.llm.model(MODEL_NAME)
+
+    def extract_text_from_pdf(self, file_path: str, max_pages: Optional[int] = None,
+                              max_chars: Optional[int] = None) -> str:
         """Extract text from PDF file."""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
+            return extract_text_from_pdf(file_path, max_pages, max_chars)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise
 
-    def extract_text_from_docx(self, file_path: str) -> str:
+    def extract_text_from_docx(self, file_path: str, max_chars: Optional[int] = None) -> str:
         """Extract text from DOCX file."""
         try:
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return extract_text_from_docx(file_path, max_chars)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
             raise
 
-    def parse_resume(self, file_path: str) -> Dict:
-        """Parse resume and extract structured information using Gemini API."""
+    @property
+    def cache_version(self) -> str:
+        """Backend, model, prompt version and extraction caps that cached parses must match."""
+        return (f"{self.llm.backend.name}:{MODEL_NAME}:prompt-v{PROMPT_VERSION}:pages-{self.max_pages}"
+                f":chars-{self.max_chars}:budget-{self.prompt_token_budget}")
+
+    def cache_key(self, file_path: str) -> str:
+        """Parse cache key for a resume file's current contents."""
+        with open(file_path, 'rb') as file:
+            return ParseCache.key(file.read(), self.cache_version)
+
+    def invalidate_cache(self, file_path: str) -> bool:
+        """Forget the cached parse of a resume file, returning whether one existed."""
+        if self.cache is None:
+            return False
+        return self.cache.invalidate(self.cache_key(file_path))
+
+    def parse_resume(self, file_path: str, refresh: bool = False) -> Dict:
+        """Parse resume and extract structured information using Gemini API.
+
+        Identical files parsed by the same model and prompt version are served
+        from the parse cache unless refresh is set.
+        """
         try:
-            # Determine file type and extract text
-            file_extension = os.path.splitext(file_path)[1].lower()
-            if file_extension == '.pdf':
-                text = self.extract_text_from_pdf(file_path)
-            elif file_extension == '.docx':
-                text = self.extract_text_from_docx(file_path)
-            else:
-                with open(file_path, 'r') as file:
-                    text = file.read()
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache_key(file_path)
+                cached = None if refresh else self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Using cached parse for {file_path}")
+                    return cached
 
+            text = extract_resume_text(file_path, self.max_pages, self.max_chars)
             logger.info(f"Extracted text from resume: {text[:200]}...")  # Log first 200 chars
+            return self.parse_text(text, cache_key)
+
+        except Exception as e:
+            logger.error(f"Error parsing resume: {str(e)}")
+            raise
 
-            # Prepare prompt for Gemini
-            prompt = f"""
+    @staticmethod
+    def _build_prompt(unresolved: Dict[str, str], token_budget: Optional[int] = None) -> str:
+        """Gemini prompt asking only for the unresolved fields, given only the text they need.
+
+        The texts share token_budget estimated tokens, each keeping its leading lines.
+        """
+        fields = [field for field in RESUME_FIELDS if field in unresolved]
+        # Several fields often share a section or the full text; send each text once
+        texts = list(dict.fromkeys(unresolved[field] for field in fields))
+        if token_budget is not None:
+            texts = fit_texts(texts, token_budget)
+        text = "\n\n".join(texts)
+        structure = ",\n".join(f'                "{field}": {FIELD_SCHEMAS[field]}' for field in fields)
+        return f"""
             You are a resume parser. Extract the following information from this resume and return it in JSON format:
             
             Resume text:
@@ -78,34 +204,7 @@ class ResumeParser:
             
             Required JSON structure:
             {{
-                "name": "Full Name",
-                "contact": {{
-                    "email": "Email address",
-                    "phone": "Phone number"
-                }},
-                "skills": ["Skill 1", "Skill 2", ...],
-                "experience": [
-                    {{
-                        "company": "Company name",
-                        "role": "Job title",
-                        "duration": "Time period",
-                        "description": "Key responsibilities and achievements"
-                    }}
-                ],
-                "education": [
-                    {{
-                        "degree": "Degree name",
-                        "institution": "School/University name",
-                        "year": "Graduation year"
-                    }}
-                ],
-                "projects": [
-                    {{
-                        "name": "Project name",
-                        "description": "Project description",
-                        "technologies": ["Tech 1", "Tech 2", ...]
-                    }}
-                ]
+{structure}
             }}
             
             Important:
@@ -115,69 +214,179 @@ class ResumeParser:
             4. Format dates consistently
             """
 
-            # Get response from Gemini
+    @staticmethod
+    def _parse_response(response_text: str) -> Optional[Dict]:
+        """Decode the model's JSON answer, or None when it cannot be read as a dict."""
+        try:
+            # Try to parse as JSON first
+            parsed_data = json.loads(response_text)
+            logger.info("Successfully parsed JSON response")
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error: {str(e)}")
+            # If not valid JSON, try to evaluate as Python dict
             try:
-                response = self.model.generate_content(prompt)
-                logger.info(f"Raw Gemini response: {response.text}")  # Log the raw response
+                # Clean the response text to ensure it's valid Python
+                cleaned_text = response_text.strip()
+                if cleaned_text.startswith('```json'):
+                    cleaned_text = cleaned_text[7:]
+                if cleaned_text.endswith('```'):
+                    cleaned_text = cleaned_text[:-3]
+                parsed_data = eval(cleaned_text)
+                logger.info("Successfully parsed Python dict response")
             except Exception as e:
-                logger.error(f"Error getting response from Gemini: {str(e)}")
-                raise
-            
-            # Parse the response
-            try:
-                # Try to parse as JSON first
-                parsed_data = json.loads(response.text)
-                logger.info("Successfully parsed JSON response")
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {str(e)}")
-                # If not valid JSON, try to evaluate as Python dict
+                logger.error(f"Error parsing response as Python dict: {str(e)}")
+                return None
+
+        if not isinstance(parsed_data, dict):
+            logger.error("Parsed data is not a dictionary")
+            return None
+        return parsed_data
+
+    def parse_text(self, text: str, cache_key: Optional[str] = None) -> Dict:
+        """Extract structured information from resume text, caching under cache_key.
+
+        The local rule tier fills what it can; only fields it could not
+        resolve are sent to Gemini, together with just their sections. The
+        result's field_sources maps each field to 'rules', 'llm' or 'default'.
+        """
+        try:
+            rules = parse_with_rules(text)
+            parsed_data = rules.data
+            sources = {field: 'rules' for field in rules.resolved}
+            # Fallback values from a failed model call are never cached
+            cacheable = True
+
+            if rules.unresolved:
+                prompt = self._build_prompt(rules.unresolved, self.prompt_token_budget)
+                # Measured against sending the whole resume for every field
+                report = PromptReport(estimate_tokens(prompt),
+                                      estimate_tokens(self._build_prompt(dict.fromkeys(RESUME_FIELDS, text))))
+                self.prompt_stats['calls'] += 1
+                self.prompt_stats['prompt_tokens'] += report.prompt_tokens
+                self.prompt_stats['tokens_saved'] += report.tokens_saved
+                logger.info(f"Sending {sorted(rules.unresolved)} to Gemini: ~{report.prompt_tokens} prompt tokens "
+                            f"({report.tokens_saved} saved of {report.full_tokens})")
+
+                # Get response from Gemini
                 try:
-                    # Clean the response text to ensure it's valid Python
-                    cleaned_text = response.text.strip()
-                    if cleaned_text.startswith('```json'):
-                        cleaned_text = cleaned_text[7:]
-                    if cleaned_text.endswith('```'):
-                        cleaned_text = cleaned_text[:-3]
-                    parsed_data = eval(cleaned_text)
-                    logger.info("Successfully parsed Python dict response")
+                    response = self.llm.generate(prompt, MODEL_NAME)
+                    logger.info(f"Raw Gemini response: {response.text}")  # Log the raw response
                 except Exception as e:
-                    logger.error(f"Error parsing response as Python dict: {str(e)}")
-                    # Return a basic structure if parsing fails
-                    parsed_data = {
-                        "name": "Unknown",
-                        "contact": {"email": "", "phone": ""},
-                        "skills": [],
-                        "experience": [],
-                        "education": [],
-                        "projects": []
-                    }
-
-            # Validate and clean the parsed data
-            if not isinstance(parsed_data, dict):
-                logger.error("Parsed data is not a dictionary")
-                parsed_data = {
-                    "name": "Unknown",
-                    "contact": {"email": "", "phone": ""},
-                    "skills": [],
-                    "experience": [],
-                    "education": [],
-                    "projects": []
-                }
-
-            # Ensure all required fields exist
-            required_fields = ['name', 'contact', 'skills', 'experience', 'education', 'projects']
-            for field in required_fields:
-                if field not in parsed_data:
-                    parsed_data[field] = [] if field in ['skills', 'experience', 'education', 'projects'] else {"email": "", "phone": ""} if field == 'contact' else "Unknown"
+                    logger.error(f"Error getting response from Gemini: {str(e)}")
+                    raise
+
+                llm_data = self._parse_response(response.text)
+                if llm_data is None:
+                    cacheable = False
+                    llm_data = {}
+                for field in rules.unresolved:
+                    if field not in llm_data:
+                        continue
+                    value = llm_data[field]
+                    if field == 'contact' and isinstance(value, dict):
+                        # Keep whatever the rules did find
+                        value = {**value, **{key: found for key, found in parsed_data['contact'].items() if found}}
+                    parsed_data[field] = value
+                    sources[field] = 'llm'
+            else:
+                logger.info("Resume fully parsed by local rules")
+
+            parsed_data['field_sources'] = {field: sources.get(field, 'default') for field in RESUME_FIELDS}
 
             logger.info(f"Final parsed data: {json.dumps(parsed_data, indent=2)}")
+            if cache_key is not None and cacheable:
+                self.cache.put(cache_key, parsed_data)
             return parsed_data
 
         except Exception as e:
-            logger.error(f"Error parsing resume: {str(e)}")
+            logger.error(f"Error parsing resume text: {str(e)}")
             raise
 
+    def parse_resumes(self, file_paths: Iterable[str], max_workers: Optional[int] = None,
+                      max_concurrent_calls: int = 4,
+                      refresh: bool = False) -> Iterator[Tuple[str, Union[Dict, Exception]]]:
+        """Parse many resumes, yielding (file_path, parsed data or exception) as each completes.
+
+        Text extraction is CPU-bound and runs in a process pool of max_workers;
+        at most max_concurrent_calls Gemini requests are in flight while
+        extraction of the remaining files continues. Cached parses are yielded
+        first. A failing file yields its exception instead of stopping the batch.
+        """
+        extract_pool = ProcessPoolExecutor(max_workers)
+        llm_pool = ThreadPoolExecutor(max_concurrent_calls)
+        try:
+            # future -> (file_path, cache_key, whether the future is the LLM stage)
+            pending = {}
+            for file_path in file_paths:
+                try:
+                    cache_key = self.cache_key(file_path) if self.cache is not None else None
+                    cached = None if cache_key is None or refresh else self.cache.get(cache_key)
+                except Exception as e:
+                    logger.error(f"Error reading resume {file_path}: {str(e)}")
+                    yield file_path, e
+                    continue
+                if cached is not None:
+                    yield file_path, cached
+                    continue
+                pending[extract_pool.submit(extract_resume_text, file_path, self.max_pages, self.max_chars)] = (file_path, cache_key, False)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, cache_key, parsed = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"Error parsing resume {file_path}: {str(error)}")
+                        yield file_path, error
+                    elif parsed:
+                        yield file_path, future.result()
+                    else:
+                        pending[llm_pool.submit(self.parse_text, future.result(), cache_key)] = (file_path, cache_key, True)
+        finally:
+            extract_pool.shutdown(cancel_futures=True)
+            llm_pool.shutdown(cancel_futures=True)
+
     def validate_parsed_data(self, data: Dict) -> bool:
         """Validate the parsed resume data."""
         required_fields = ['name', 'contact', 'skills', 'experience', 'education']
-        return all(field in data for field in required_fields) 
\ No newline at end of file
+        return all(field in data for field in required_fields)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Parse every resume in a directory into JSONL")
+    parser.add_argument('directory', help="directory of PDF, DOCX or text resumes, e.g. data/resumes")
+    parser.add_argument('--output', '-o', help="JSONL file to write (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None, help="text extraction processes")
+    parser.add_argument('--concurrency', type=int, default=4, help="Gemini calls in flight")
+    parser.add_argument('--cache', default=os.path.join("data", "cache", "resume_parses.sqlite"),
+                        help="parse cache path, or empty to disable")
+    parser.add_argument('--refresh', action='store_true', help="ignore cached parses")
+    args = parser.parse_args()
+
+    load_dotenv()
+    resume_parser = ResumeParser(os.getenv('GEMINI_API_KEY'), cache=ParseCache(args.cache) if args.cache else None)
+    file_paths = sorted(
+        os.path.join(args.directory, name) for name in os.listdir(args.directory)
+        if os.path.splitext(name)[1].lower() in RESUME_EXTENSIONS
+    )
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failures = 0
+    try:
+        for file_path, result in resume_parser.parse_resumes(file_paths, args.workers, args.concurrency, args.refresh):
+            if isinstance(result, Exception):
+                failures += 1
+                record = {'path': file_path, 'error': str(result)}
+            else:
+                record = {'path': file_path, 'resume': result}
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logger.info(f"Parsed {len(file_paths) - failures} of {len(file_paths)} resumes")
+
+
+if __name__ == "__main__":
+    main()
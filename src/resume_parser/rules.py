@@ -0,0 +1,254 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+import logging
+
+from utils.text import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESUME_FIELDS = ('name', 'contact', 'skills', 'experience', 'education', 'projects')
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"(?<![\w])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{3,5}[\s.-]?\d{3,4}[\s.-]?\d{0,4}(?![\w])")
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+MIN_PHONE_DIGITS = 10
+NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?: [A-Za-z][A-Za-z.'-]*){1,3}$")
+# Words that mark a first line as a document title or job title rather than a name
+NOT_NAME_WORDS = {
+    'curriculum', 'vitae', 'resume', 'cv', 'bio', 'biodata', 'profile', 'portfolio', 'contact',
+    'engineer', 'developer', 'programmer', 'scientist', 'analyst', 'designer', 'manager', 'consultant',
+    'architect', 'intern', 'student', 'specialist', 'administrator', 'director', 'officer', 'lead',
+    'senior', 'junior', 'software', 'data', 'web', 'full', 'stack', 'frontend', 'backend',
+}
+
+# Heading text (lowercased, without trailing colon) -> schema section
+SECTION_HEADINGS = {
+    'skills': 'skills', 'technical skills': 'skills', 'key skills': 'skills', 'core competencies': 'skills',
+    'skills & tools': 'skills', 'technologies': 'skills', 'tech stack': 'skills',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment history': 'experience', 'work history': 'experience', 'internships': 'experience',
+    'education': 'education', 'academic background': 'education', 'academics': 'education',
+    'educational qualifications': 'education', 'qualifications': 'education',
+    'projects': 'projects', 'personal projects': 'projects', 'academic projects': 'projects',
+    'key projects': 'projects',
+    # Sections outside the schema still end the previous section
+    'summary': 'other', 'professional summary': 'other', 'profile': 'other', 'objective': 'other',
+    'certifications': 'other', 'achievements': 'other', 'awards': 'other', 'interests': 'other',
+    'hobbies': 'other', 'languages': 'other', 'publications': 'other', 'references': 'other',
+}
+
+# Canonical spelling of known skills, keyed by their token sequence
+SKILLS_VOCABULARY = {
+    tuple(tokenize(skill)): skill for skill in [
+        'Python', 'Java', 'JavaScript', 'TypeScript', 'C', 'C++', 'C#', 'Go', 'Rust', 'Kotlin', 'Swift',
+        'Scala', 'R', 'SQL', 'Bash', 'HTML', 'CSS', 'React', 'Angular', 'Vue.js', 'Node.js', 'Next.js',
+        'Express', 'Django', 'Flask', 'FastAPI', 'Spring Boot', 'TensorFlow', 'PyTorch', 'Keras',
+        'scikit-learn', 'Pandas', 'NumPy', 'Matplotlib', 'OpenCV', 'Hugging Face', 'LangChain',
+        'Machine Learning', 'Deep Learning', 'NLP', 'Natural Language Processing', 'Computer Vision',
+        'Data Analysis', 'Data Visualization', 'Statistics', 'AWS', 'Azure', 'GCP', 'Docker',
+        'Kubernetes', 'Terraform', 'Ansible', 'Jenkins', 'CI/CD', 'Git', 'Linux', 'Spark', 'Hadoop',
+        'Kafka', 'Airflow', 'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Elasticsearch', 'GraphQL',
+        'REST APIs', 'Microservices', 'Power BI', 'Tableau', 'Excel', 'Figma', 'Agile', 'Scrum',
+    ]
+}
+MAX_SKILL_TOKENS = max(len(tokens) for tokens in SKILLS_VOCABULARY)
+
+DEGREE_PATTERN = re.compile(
+    r"\b(?:B\.?\s?Tech|M\.?\s?Tech|B\.?\s?E|M\.?\s?E|B\.?\s?Sc|M\.?\s?Sc|B\.?\s?S|M\.?\s?S|B\.?\s?A|M\.?\s?A|"
+    r"B\.?\s?Com|M\.?\s?Com|BCA|MCA|MBA|Ph\.?\s?D|Bachelor(?:'s)?|Master(?:'s)?|Diploma|Doctorate)\b",
+    re.IGNORECASE,
+)
+INSTITUTION_PATTERN = re.compile(r"\b(?:University|Institute|College|School|Academy|IIT|NIT|IIIT|BITS)\b",
+                                 re.IGNORECASE)
+FIELD_SEPARATORS = re.compile(r"\s*(?:[,|•]|\s[-–—]\s)\s*")
+BULLET_PATTERN = re.compile(r"^[\s•*·▪-]+")
+
+# Fewer dictionary hits than this are left for the LLM to complete
+MIN_SKILLS = 3
+
+
+class RuleParse(NamedTuple):
+    """Result of rule-based parsing: filled schema, which fields were resolved, and leftover text."""
+    data: Dict
+    resolved: List[str]
+    # Unresolved field -> text the LLM should see for it
+    unresolved: Dict[str, str]
+
+    @property
+    def confidence(self) -> float:
+        return len(self.resolved) / len(RESUME_FIELDS)
+
+
+def empty_resume() -> Dict:
+    """Resume schema with every field empty."""
+    return {
+        "name": "Unknown",
+        "contact": {"email": "", "phone": ""},
+        "skills": [],
+        "experience": [],
+        "education": [],
+        "projects": []
+    }
+
+
+def _heading(line: str) -> Optional[str]:
+    """Schema section a line introduces, if it is a section heading."""
+    candidate = BULLET_PATTERN.sub('', line).strip().rstrip(':').strip().lower()
+    if not candidate or len(candidate) > 40:
+        return None
+    return SECTION_HEADINGS.get(candidate)
+
+
+def segment_sections(text: str) -> Dict[str, str]:
+    """Split resume text at known headings; text before the first heading is 'header'."""
+    sections: Dict[str, List[str]] = {'header': []}
+    current = 'header'
+    for line in text.splitlines():
+        section = _heading(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def _mentions_section(lowered: str, section: str) -> bool:
+    """Whether any heading keyword of section appears anywhere in the lowercased text."""
+    return any(heading in lowered for heading, name in SECTION_HEADINGS.items() if name == section)
+
+
+def looks_like_name(line: str) -> bool:
+    """Whether a line has a person's name shape and no title words such as "Curriculum Vitae"."""
+    return (NAME_PATTERN.match(line) is not None and _heading(line) is None
+            and NOT_NAME_WORDS.isdisjoint(word.strip(".'-") for word in line.lower().split()))
+
+
+def find_phone(text: str) -> Optional[str]:
+    """First phone-number-shaped match: at least MIN_PHONE_DIGITS digits, or a +/parenthesized prefix.
+
+    Runs of years such as "2019-2023" or "2019 2020 2021" share a phone
+    number's shape, so matches made mostly of year tokens are skipped.
+    """
+    for match in PHONE_PATTERN.finditer(text):
+        candidate = match.group(0).strip()
+        digits = sum(char.isdigit() for char in candidate)
+        if 2 * 4 * len(YEAR_PATTERN.findall(candidate)) >= digits:
+            continue
+        if digits >= MIN_PHONE_DIGITS or candidate.startswith(('+', '(')):
+            return candidate
+    return None
+
+
+def vocabulary_skills(text: str) -> List[str]:
+    """Known skills mentioned anywhere in text, in order of first mention."""
+    tokens = tokenize(text)
+    found: Dict[str, None] = {}
+    for start in range(len(tokens)):
+        for size in range(MAX_SKILL_TOKENS, 0, -1):
+            skill = SKILLS_VOCABULARY.get(tuple(tokens[start:start + size]))
+            if skill is not None:
+                found.setdefault(skill, None)
+                break
+    return list(found)
+
+
+def section_skills(section: str) -> List[str]:
+    """Skills listed in a skills section, split on commas, bullets and line breaks."""
+    skills: Dict[str, None] = {}
+    for line in section.splitlines():
+        line = BULLET_PATTERN.sub('', line).strip()
+        # Drop group labels such as "Languages: ..."
+        if ':' in line:
+            line = line.split(':', 1)[1]
+        for item in re.split(r"[,;|•]|\s{2,}", line):
+            item = item.strip(" .")
+            if item and len(item) <= 40:
+                skills.setdefault(item, None)
+    return list(skills)
+
+
+def parse_education(section: str) -> Optional[List[Dict]]:
+    """Education entries from one-line "degree, institution, year" lines, or None if any line is unclear."""
+    entries = []
+    for line in section.splitlines():
+        line = BULLET_PATTERN.sub('', line).strip()
+        if not line:
+            continue
+        degree_match = DEGREE_PATTERN.search(line)
+        year_match = YEAR_PATTERN.findall(line)
+        parts = [part for part in FIELD_SEPARATORS.split(line) if part]
+        institution = next((part for part in parts if INSTITUTION_PATTERN.search(part)), None)
+        if degree_match is None or institution is None:
+            return None
+        degree = next(part for part in parts if DEGREE_PATTERN.search(part))
+        entries.append({
+            "degree": YEAR_PATTERN.sub('', degree).strip(" ()-–"),
+            "institution": YEAR_PATTERN.sub('', institution).strip(" ()-–"),
+            "year": year_match[-1] if year_match else "",
+        })
+    return entries
+
+
+def parse_with_rules(text: str) -> RuleParse:
+    """Fill the resume schema with regex, section segmentation and the skills dictionary.
+
+    Fields the rules cannot settle are returned in unresolved with the text
+    the LLM needs for them: the matching section when one was found,
+    otherwise the whole resume. When the resume has recognizable section
+    headings, a section that is missing is taken to be empty, unless its
+    keyword still appears in the text (e.g. a heading glued to a line).
+    """
+    data = empty_resume()
+    resolved: List[str] = []
+    unresolved: Dict[str, str] = {}
+    sections = segment_sections(text)
+    structured = any(name in sections for name in ('skills', 'experience', 'education', 'projects'))
+    lowered = text.lower()
+
+    email = EMAIL_PATTERN.search(text)
+    phone = find_phone(EMAIL_PATTERN.sub(' ', text))
+    data['contact'] = {"email": email.group(0) if email else "", "phone": phone or ""}
+    if email and phone:
+        resolved.append('contact')
+    else:
+        unresolved['contact'] = sections['header'] or text
+
+    for line in sections['header'].splitlines():
+        line = line.strip()
+        if line:
+            if looks_like_name(line):
+                data['name'] = line
+                resolved.append('name')
+            break
+    if 'name' not in resolved:
+        unresolved['name'] = sections['header'] or text
+
+    skills = section_skills(sections['skills']) if sections.get('skills') else []
+    if not skills:
+        skills = vocabulary_skills(text)
+    if len(skills) >= MIN_SKILLS:
+        data['skills'] = skills
+        resolved.append('skills')
+    else:
+        unresolved['skills'] = sections.get('skills') or text
+
+    education = parse_education(sections['education']) if sections.get('education') else None
+    if education:
+        data['education'] = education
+        resolved.append('education')
+    elif structured and not sections.get('education') and not _mentions_section(lowered, 'education'):
+        resolved.append('education')
+    else:
+        unresolved['education'] = sections.get('education') or text
+
+    # Free-form entries always need the LLM when their section has content
+    for field in ('experience', 'projects'):
+        if structured and not sections.get(field) and not _mentions_section(lowered, field):
+            resolved.append(field)
+        else:
+            unresolved[field] = sections.get(field) or text
+
+    return RuleParse(data, resolved, unresolved)
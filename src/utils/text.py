@@ -0,0 +1,22 @@
+import re
+import hashlib
+from typing import List
+
+# Tokens keep the punctuation that matters in tech skills (c++, c#, node.js)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+|(?:\.[a-z0-9]+)+)?")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse runs of whitespace."""
+    return " ".join(str(text).lower().split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def stable_hash(value: str, digest_size: int = 8) -> int:
+    """Hash a string to an unsigned integer that is identical across processes."""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=digest_size).digest()
+    return int.from_bytes(digest, 'little')
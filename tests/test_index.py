@@ -0,0 +1,20 @@
+import pytest
+
+from job_search.index import TextIndex
+
+TEXTS = ["Senior Go developer", "Data engineer (AWS)", "UI/UX designer", "C++ systems engineer"]
+
+
+@pytest.fixture
+def index():
+    text_index = TextIndex()
+    for row, text in enumerate(TEXTS):
+        text_index.add(row, (text,))
+    return text_index
+
+
+@pytest.mark.parametrize('query', ['go', 'g', 'ui', 'c+', '+', '(', 'aw', 'engineer', 'data eng', 'zz'])
+def test_search_matches_substring_semantics(index, query):
+    expected = {row for row, text in enumerate(TEXTS) if query in text.lower()}
+
+    assert index.search(query) == expected
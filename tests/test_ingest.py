@@ -0,0 +1,55 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from job_search.ingest import IngestionPipeline, SourceAdapter
+
+
+class MemorySource(SourceAdapter):
+    platform = 'Memory'
+
+    def __init__(self, pages: int, per_page: int):
+        super().__init__('memory', rate_limit=1000.0)
+        self.pages = pages
+        self.per_page = per_page
+
+    async def fetch_page(self, page: int) -> Optional[List[Dict]]:
+        if page > self.pages:
+            return None
+        first = (page - 1) * self.per_page
+        return [{'id': first + number} for number in range(self.per_page)]
+
+    def normalize(self, raw: Dict) -> Dict:
+        return {'id': raw['id'], 'title': f"Job {raw['id']}", 'platform': self.platform}
+
+
+def run_pipeline(sinks, batch_size: int = 100):
+    pipeline = IngestionPipeline([MemorySource(pages=5, per_page=1000)], sinks, batch_size)
+    return asyncio.run(asyncio.wait_for(pipeline.run(), timeout=10))
+
+
+def test_failing_sink_does_not_hang_the_pipeline():
+    stored = []
+
+    def failing_sink(batch):
+        raise RuntimeError("index unavailable")
+
+    stats = run_pipeline([failing_sink, stored.extend])
+
+    assert stats['Memory'].postings == 5000
+    assert stats['Memory'].sink_errors == 5000
+    # The healthy sink still receives every batch
+    assert len(stored) == 5000
+
+
+def test_partially_failing_sink_records_lost_postings():
+    calls = []
+
+    def flaky_sink(batch):
+        calls.append(len(batch))
+        if len(calls) % 2:
+            raise RuntimeError("temporary failure")
+
+    stats = run_pipeline([flaky_sink])
+
+    assert sum(calls) == 5000
+    assert stats['Memory'].sink_errors == sum(calls[::2])
@@ -0,0 +1,57 @@
+from typing import Sequence
+
+import numpy as np
+
+from llm.client import estimate_tokens
+from rag_system.prompting import build_cover_letter_prompt
+from utils.text import tokenize
+
+JOB = {
+    'title': 'Backend Engineer',
+    'company': 'Acme',
+    'description': ' '.join(["We build reliable payment services for millions of merchants."] * 20),
+    'requirements': ['Python', 'PostgreSQL', 'Kafka', 'Docker', 'Kubernetes', 'AWS'],
+}
+RESUME = {
+    'name': 'Jane Doe',
+    'skills': ['Photoshop', 'Illustrator', 'InDesign', 'Lightroom', 'Premiere Pro', 'After Effects',
+               'Kafka', 'Figma', 'Sketch', 'Typography', 'Color Theory', 'Branding'],
+    'experience': [
+        {'role': 'Designer', 'company': 'Studio',
+         'description': 'Designed brochures and posters for clients. Ran photo shoots for catalogues. '
+                        'Prepared print-ready artwork for magazines.'},
+        {'role': 'Engineer', 'company': 'Payments Co',
+         'description': 'Built Kafka payment services for merchants in Python.'},
+    ],
+    'education': [{'degree': 'B.Tech', 'institution': 'IIT Bombay'}],
+    'projects': [{'name': 'Portfolio', 'description': 'Personal design portfolio website.'}],
+}
+
+
+def overlap_scores(job_text: str, items: Sequence[str]) -> np.ndarray:
+    job_terms = set(tokenize(job_text))
+    return np.array([len(job_terms.intersection(tokenize(item))) for item in items], dtype=np.float32)
+
+
+def test_tight_budget_keeps_top_skill_and_experience():
+    prompt, report = build_cover_letter_prompt(JOB, RESUME, overlap_scores, token_budget=150)
+
+    skills = prompt.split("- Skills: ", 1)[1].split("\n", 1)[0].split(", ")
+    assert "Kafka" in skills
+    assert len(skills) < len(RESUME['skills'])
+    assert "- Engineer at Payments Co: Built Kafka payment services" in prompt
+    assert report.prompt_tokens < report.full_tokens
+
+
+def test_job_text_shrinks_before_candidate_items():
+    prompt, _ = build_cover_letter_prompt(JOB, RESUME, overlap_scores, token_budget=150)
+
+    description = prompt.split("- Description: ", 1)[1].split("\n", 1)[0]
+    assert estimate_tokens(description) < 150 * 0.25
+
+
+def test_no_budget_keeps_everything():
+    prompt, report = build_cover_letter_prompt(JOB, RESUME, overlap_scores, token_budget=None)
+
+    assert all(skill in prompt for skill in RESUME['skills'])
+    assert report.prompt_tokens == report.full_tokens
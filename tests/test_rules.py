@@ -0,0 +1,40 @@
+import pytest
+
+from resume_parser.rules import find_phone, looks_like_name, parse_with_rules
+
+
+@pytest.mark.parametrize('text', [
+    'Acme Corp, Engineer, 2019-2023',
+    '2019 2023',
+    '(2019) 2023',
+    'GPA 9.1 2019 2020 2021',
+])
+def test_year_runs_are_not_phone_numbers(text):
+    assert find_phone(text) is None
+
+
+@pytest.mark.parametrize('text, phone', [
+    ('call +91 98765 43210', '+91 98765 43210'),
+    ('(022) 2345 6789', '(022) 2345 6789'),
+    ('Graduated 2019 - 2023 | 98765-43210', '98765-43210'),
+])
+def test_phone_numbers_are_found(text, phone):
+    assert find_phone(text) == phone
+
+
+@pytest.mark.parametrize('line', ['Curriculum Vitae', 'Software Engineer', 'RESUME', 'Senior Data Analyst'])
+def test_titles_are_not_names(line):
+    assert not looks_like_name(line)
+
+
+@pytest.mark.parametrize('line', ['Jane Doe', 'RIYAAN SHETH', "Mary-Ann O'Neil"])
+def test_names_are_recognized(line):
+    assert looks_like_name(line)
+
+
+def test_year_runs_and_title_lines_are_left_for_the_llm():
+    rules = parse_with_rules("Curriculum Vitae\njane@example.com\nGPA 9.1 2019 2020 2021\n\nSkills\nPython, SQL, Docker")
+
+    assert 'contact' in rules.unresolved
+    assert 'name' in rules.unresolved
+    assert 'skills' in rules.resolved
@@ -0,0 +1,29 @@
+import math
+
+import pytest
+
+from job_search.salary import parse_salary
+
+
+@pytest.mark.parametrize('text, low, high, currency', [
+    ('$50k-$60k + 10% bonus', 50_000, 60_000, 'USD'),
+    ('$120k - $150k', 120_000, 150_000, 'USD'),
+    ('₹18 - 26 LPA', 1_800_000, 2_600_000, 'INR'),
+    ('12-18 LPA', 1_200_000, 1_800_000, 'INR'),
+    ('10 to 15 lakhs', 1_000_000, 1_500_000, 'INR'),
+    ('₹25,00,000 - ₹35,00,000', 2_500_000, 3_500_000, 'INR'),
+])
+def test_parse_salary_ranges(text, low, high, currency):
+    salary = parse_salary(text)
+
+    assert (salary.min, salary.max, salary.currency) == (low, high, currency)
+
+
+def test_percentages_are_not_amounts():
+    salary = parse_salary('Up to 30%')
+
+    assert math.isnan(salary.min) and math.isnan(salary.max)
+
+
+def test_hourly_pay_is_annualized():
+    assert parse_salary('$45/hr').annual_min == 45 * 2080